@@ -1,5 +1,6 @@
 from datetime import timedelta
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from pydantic import BaseModel, EmailStr
@@ -8,7 +9,8 @@ from app.core.security import (
     verify_password,
     get_password_hash,
     create_access_token,
-    get_current_user
+    get_current_user,
+    invalidate_cached_token
 )
 from app.core.config import settings
 from app.models.models import User
@@ -98,6 +100,8 @@ def get_current_user_info(current_user: User = Depends(get_current_user)):
 
 
 @router.post("/logout")
-def logout():
+def logout(authorization: Optional[str] = Header(None)):
     """Logout (client should discard token)"""
+    if authorization and authorization.startswith("Bearer "):
+        invalidate_cached_token(authorization.replace("Bearer ", ""))
     return {"message": "Successfully logged out"}
@@ -1,24 +1,49 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Header
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, UploadFile, File
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.orm import Session, selectinload
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Dict, List, Optional
 import os
+import secrets
 import aiofiles
-from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timedelta
 
-from app.core.database import get_db
-from app.core.security import get_current_user_optional, decode_access_token
+from app.core.database import SessionLocal, get_db
+from app.core.security import get_current_user_id_optional
 from app.core.config import settings
-from app.models.models import User, CV, Skill, WorkExperience
+from app.core.cache import invalidate_shared_reports
+from app.models.models import (
+    CV, Skill, WorkExperience, Recommendation, CVVersion, ProgressEntry, LearnedSkill, SharedReport,
+    CV_STATUS_PENDING, CV_STATUS_COMPLETED, CV_STATUS_FAILED
+)
 from app.services.cv_parser import CVParser
 from app.services.skill_extractor import SkillExtractor
 
 router = APIRouter(prefix="/cv", tags=["CV"])
 
-# Ensure upload directory exists
-UPLOAD_DIR = Path(settings.UPLOAD_DIR)
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+# Ensure upload directory exists (kept as a str so per-upload joins stay cheap)
+UPLOAD_DIR = os.fspath(settings.UPLOAD_DIR)
+os.makedirs(UPLOAD_DIR, exist_ok=True)
+
+# Uploads are copied to disk in 1MB chunks rather than read into memory whole
+UPLOAD_CHUNK_SIZE = 1 << 20
+ALLOWED_EXTENSIONS = frozenset(settings.ALLOWED_EXTENSIONS)
+
+# Parsing runs in a background task, which does not survive a server restart;
+# a CV still pending this long after its upload is treated as failed
+PROCESSING_TIMEOUT = timedelta(minutes=10)
+
+# Parsing services are stateless, so a single instance is shared across requests
+_PARSER = CVParser()
+_EXTRACTOR = SkillExtractor()
+
+# Tables that reference cvs.id (shared reports are handled separately)
+_CV_CHILD_MODELS = (Skill, WorkExperience, Recommendation, CVVersion, ProgressEntry, LearnedSkill)
+
+
+def shutdown_parser_pool():
+    """Stop the CV parser's PDF worker processes"""
+    _PARSER.close()
 
 
 # Pydantic models
@@ -28,6 +53,7 @@ class CVResponse(BaseModel):
     upload_date: datetime
     years_experience: Optional[float]
     education_level: Optional[str]
+    status: str
     
     class Config:
         from_attributes = True
@@ -66,194 +92,186 @@ class CVDetailResponse(BaseModel):
     cv: CVResponse
     skills: List[SkillResponse]
     work_experiences: List[WorkExperienceResponse]
-    parsed_content: Optional[str]
+    parsed_content: Optional[Dict[str, str]]
 
 
-class CVAnalysisResponse(BaseModel):
+class CVUploadResponse(BaseModel):
     cv_id: int
     filename: str
-    skills_found: int
-    skills: List[SkillResponse]
-    work_experiences: List[WorkExperienceResponse]
-    work_experience_count: int
-    years_experience: Optional[float]
-    education_level: Optional[str]
-    sections: dict
+    status: str
 
 
-@router.post("/upload", response_model=CVAnalysisResponse, status_code=status.HTTP_201_CREATED)
-async def upload_cv(
-    file: UploadFile = File(...),
-    authorization: Optional[str] = Header(None),
-    db: Session = Depends(get_db)
-):
-    """Upload and analyze a CV (supports guest access)"""
-    
-    # Get current user if authenticated
-    current_user = None
-    if authorization and authorization.startswith("Bearer "):
-        token = authorization.replace("Bearer ", "")
-        email = decode_access_token(token)
-        if email:
-            current_user = db.query(User).filter(User.email == email).first()
-    
-    # Validate file extension
-    file_ext = Path(file.filename).suffix.lower()
-    if file_ext not in settings.ALLOWED_EXTENSIONS:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"File type {file_ext} not allowed. Use PDF or DOCX."
-        )
-    
-    # Check file size
-    contents = await file.read()
-    if len(contents) > settings.MAX_UPLOAD_SIZE:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="File size exceeds maximum allowed size (10MB)"
-        )
-    
-    # Save file
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    user_prefix = current_user.id if current_user else "guest"
-    safe_filename = f"{user_prefix}_{timestamp}_{file.filename}"
-    file_path = UPLOAD_DIR / safe_filename
-    
-    async with aiofiles.open(file_path, 'wb') as f:
-        await f.write(contents)
-    
+def _process_cv(cv_id: int, file_path: str):
+    """Parse an uploaded CV and store its skills and work experience (runs after the upload response)"""
+    db = SessionLocal()
     try:
         # Parse CV
-        parser = CVParser()
-        parsed_data = parser.parse_file(str(file_path))
-        sections = parser.extract_sections(parsed_data['raw_text'])
+        parsed_data = _PARSER.parse_file(file_path)
+        sections = _PARSER.extract_sections(parsed_data['raw_text'])
         
         # Extract skills
-        extractor = SkillExtractor()
-        skills = extractor.extract_skills(parsed_data['raw_text'])
+        skills = _EXTRACTOR.extract_skills(parsed_data['raw_text'])
         
         # Extract work experience
-        work_experiences = parser.extract_work_experience(parsed_data['raw_text'])
+        work_experiences = _PARSER.extract_work_experience(parsed_data['raw_text'])
         
-        # Save to database (with optional user_id for guest access)
-        cv = CV(
-            user_id=current_user.id if current_user else None,
-            filename=file.filename,
-            raw_text=parsed_data['raw_text'],
-            parsed_content=str(sections),
-            years_experience=parsed_data.get('years_experience'),
-            education_level=parsed_data.get('education_level')
+        db.execute(
+            update(CV).where(CV.id == cv_id).values(
+                raw_text=parsed_data['raw_text'],
+                parsed_content=sections,
+                years_experience=parsed_data.get('years_experience'),
+                education_level=parsed_data.get('education_level'),
+                status=CV_STATUS_COMPLETED
+            )
         )
-        db.add(cv)
-        db.commit()
-        db.refresh(cv)
         
-        # Save skills (using add_all for better performance while maintaining session)
-        skill_objects = []
-        for skill_data in skills:
-            skill = Skill(
-                cv_id=cv.id,
-                skill_name=skill_data['name'],
-                skill_category=skill_data.get('category'),
-                skill_level=skill_data.get('level'),
-                confidence_score=skill_data.get('confidence', 0.8)
+        # Save skills and work experiences with one bulk INSERT each
+        if skills:
+            db.execute(
+                insert(Skill),
+                [
+                    {
+                        "cv_id": cv_id,
+                        "skill_name": skill_data['name'],
+                        "skill_category": skill_data.get('category'),
+                        "skill_level": skill_data.get('level'),
+                        "confidence_score": skill_data.get('confidence', 0.8)
+                    }
+                    for skill_data in skills
+                ]
             )
-            skill_objects.append(skill)
         
         # Save work experiences with enhanced fields
-        work_experience_objects = []
-        for exp_data in work_experiences:
-            work_exp = WorkExperience(
-                cv_id=cv.id,
-                job_title=exp_data.get('job_title', ''),
-                company_name=exp_data.get('company_name'),
-                start_date=exp_data.get('start_date'),
-                end_date=exp_data.get('end_date'),
-                duration_months=exp_data.get('duration_months'),
-                description=exp_data.get('description'),
-                technologies_used=exp_data.get('technologies_used'),
-                is_current=exp_data.get('is_current', False),
-                seniority_level=exp_data.get('seniority_level'),
-                company_size=exp_data.get('company_size'),
-                company_industry=exp_data.get('company_industry')
+        if work_experiences:
+            db.execute(
+                insert(WorkExperience),
+                [
+                    {
+                        "cv_id": cv_id,
+                        "job_title": exp_data.get('job_title', ''),
+                        "company_name": exp_data.get('company_name'),
+                        "start_date": exp_data.get('start_date'),
+                        "end_date": exp_data.get('end_date'),
+                        "duration_months": exp_data.get('duration_months'),
+                        "description": exp_data.get('description'),
+                        "technologies_used": exp_data.get('technologies_used'),
+                        "is_current": exp_data.get('is_current', False),
+                        "seniority_level": exp_data.get('seniority_level'),
+                        "company_size": exp_data.get('company_size'),
+                        "company_industry": exp_data.get('company_industry')
+                    }
+                    for exp_data in work_experiences
+                ]
             )
-            work_experience_objects.append(work_exp)
         
-        # Add all objects at once and commit (faster than individual adds)
-        db.add_all(skill_objects + work_experience_objects)
         db.commit()
         
-        # Refresh to get IDs (objects are in session, so this works)
-        for skill in skill_objects:
-            db.refresh(skill)
-        for work_exp in work_experience_objects:
-            db.refresh(work_exp)
-        
-        return {
-            "cv_id": cv.id,
-            "filename": cv.filename,
-            "skills_found": len(skill_objects),
-            "skills": skill_objects,
-            "work_experiences": work_experience_objects,
-            "work_experience_count": len(work_experience_objects),
-            "years_experience": cv.years_experience,
-            "education_level": cv.education_level,
-            "sections": sections
-        }
-        
     except Exception as e:
+        print(f"Error processing CV {cv_id}: {e}")
+        db.rollback()
+        db.execute(update(CV).where(CV.id == cv_id).values(status=CV_STATUS_FAILED))
+        db.commit()
+        
         # Clean up file on error
-        if file_path.exists():
-            file_path.unlink()
+        if os.path.exists(file_path):
+            os.remove(file_path)
+    finally:
+        db.close()
+
+
+@router.post("/upload", response_model=CVUploadResponse, status_code=status.HTTP_202_ACCEPTED)
+async def upload_cv(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    current_user_id: Optional[int] = Depends(get_current_user_id_optional),
+    db: Session = Depends(get_db)
+):
+    """
+    Upload a CV for analysis (supports guest access).
+    
+    The file is stored and the CV is created with status "pending"; parsing
+    runs after the response is sent. Poll GET /cv/{cv_id} until the status
+    is "completed" (or "failed").
+    """
+    
+    # Validate file extension
+    file_ext = os.path.splitext(file.filename)[1].lower()
+    if file_ext not in ALLOWED_EXTENSIONS:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error processing CV: {str(e)}"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"File type {file_ext} not allowed. Use PDF or DOCX."
         )
+    
+    # Save file under a random name, streaming it to disk in chunks while
+    # enforcing the size limit; the client filename is never used in the path
+    user_prefix = current_user_id or "guest"
+    safe_filename = f"{user_prefix}_{secrets.token_hex(8)}{file_ext}"
+    file_path = os.path.join(UPLOAD_DIR, safe_filename)
+    
+    total_size = 0
+    async with aiofiles.open(file_path, 'wb') as f:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            total_size += len(chunk)
+            if total_size > settings.MAX_UPLOAD_SIZE:
+                break
+            await f.write(chunk)
+    
+    if total_size > settings.MAX_UPLOAD_SIZE:
+        os.remove(file_path)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File size exceeds maximum allowed size (10MB)"
+        )
+    
+    # Save to database (with optional user_id for guest access)
+    cv = CV(
+        user_id=current_user_id,
+        filename=file.filename,
+        status=CV_STATUS_PENDING
+    )
+    db.add(cv)
+    db.commit()
+    
+    background_tasks.add_task(_process_cv, cv.id, file_path)
+    
+    return {
+        "cv_id": cv.id,
+        "filename": cv.filename,
+        "status": cv.status
+    }
 
 
 @router.get("/list", response_model=List[CVResponse])
 def list_cvs(
-    authorization: Optional[str] = Header(None),
+    current_user_id: Optional[int] = Depends(get_current_user_id_optional),
     db: Session = Depends(get_db)
 ):
     """List all CVs for current user (requires authentication)"""
-    # Get current user if authenticated
-    current_user = None
-    if authorization and authorization.startswith("Bearer "):
-        token = authorization.replace("Bearer ", "")
-        email = decode_access_token(token)
-        if email:
-            current_user = db.query(User).filter(User.email == email).first()
-    
-    if not current_user:
+    if current_user_id is None:
         # Guest users don't have a CV list
         return []
     
-    cvs = db.query(CV).filter(CV.user_id == current_user.id).order_by(CV.upload_date.desc()).all()
+    cvs = db.query(CV).filter(CV.user_id == current_user_id).order_by(CV.upload_date.desc()).all()
     return cvs
 
 
 @router.get("/{cv_id}", response_model=CVDetailResponse)
 def get_cv_detail(
     cv_id: int,
-    authorization: Optional[str] = Header(None),
+    current_user_id: Optional[int] = Depends(get_current_user_id_optional),
     db: Session = Depends(get_db)
 ):
     """Get detailed information about a specific CV (supports guest access)"""
-    # Get current user if authenticated
-    current_user = None
-    if authorization and authorization.startswith("Bearer "):
-        token = authorization.replace("Bearer ", "")
-        email = decode_access_token(token)
-        if email:
-            current_user = db.query(User).filter(User.email == email).first()
-    
     # For authenticated users, only show their own CVs
     # For guests, allow viewing any CV by ID
-    if current_user:
-        cv = db.query(CV).filter(CV.id == cv_id, CV.user_id == current_user.id).first()
-    else:
-        cv = db.query(CV).filter(CV.id == cv_id).first()
+    # Skills and work experiences are eager-loaded in one IN(...) batch each
+    query = db.query(CV).options(
+        selectinload(CV.skills),
+        selectinload(CV.work_experiences)
+    ).filter(CV.id == cv_id)
+    if current_user_id is not None:
+        query = query.filter(CV.user_id == current_user_id)
+    cv = query.first()
     
     if not cv:
         raise HTTPException(
@@ -261,13 +279,24 @@ def get_cv_detail(
             detail="CV not found"
         )
     
-    skills = db.query(Skill).filter(Skill.cv_id == cv_id).all()
-    work_experiences = db.query(WorkExperience).filter(WorkExperience.cv_id == cv_id).all()
+    if (
+        cv.status == CV_STATUS_PENDING
+        and cv.upload_date is not None
+        and cv.upload_date < datetime.utcnow() - PROCESSING_TIMEOUT
+    ):
+        # Only a row that is still pending, in case parsing just finished
+        db.execute(
+            update(CV)
+            .where(CV.id == cv_id, CV.status == CV_STATUS_PENDING)
+            .values(status=CV_STATUS_FAILED)
+        )
+        db.commit()
+        db.refresh(cv)
     
     return {
         "cv": cv,
-        "skills": skills,
-        "work_experiences": work_experiences,
+        "skills": cv.skills,
+        "work_experiences": cv.work_experiences,
         "parsed_content": cv.parsed_content
     }
 
@@ -275,35 +304,42 @@ def get_cv_detail(
 @router.delete("/{cv_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_cv(
     cv_id: int,
-    authorization: Optional[str] = Header(None),
+    current_user_id: Optional[int] = Depends(get_current_user_id_optional),
     db: Session = Depends(get_db)
 ):
     """Delete a CV (requires authentication)"""
-    # Get current user if authenticated
-    current_user = None
-    if authorization and authorization.startswith("Bearer "):
-        token = authorization.replace("Bearer ", "")
-        email = decode_access_token(token)
-        if email:
-            current_user = db.query(User).filter(User.email == email).first()
-    
-    if not current_user:
+    if current_user_id is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Authentication required to delete CVs"
         )
     
-    cv = db.query(CV).filter(CV.id == cv_id, CV.user_id == current_user.id).first()
+    # Child rows are removed with one DELETE per table, scoped to CVs the
+    # user owns, instead of loading every collection for the ORM cascade
+    owned_cv = select(CV.id).where(CV.id == cv_id, CV.user_id == current_user_id)
+    share_tokens = db.execute(
+        delete(SharedReport)
+        .where(SharedReport.cv_id.in_(owned_cv))
+        .returning(SharedReport.share_token)
+    ).scalars().all()
+    for model in _CV_CHILD_MODELS:
+        db.execute(delete(model).where(model.cv_id.in_(owned_cv)))
     
-    if not cv:
+    # Ownership check and delete in one statement
+    deleted = db.execute(
+        delete(CV)
+        .where(CV.id == cv_id, CV.user_id == current_user_id)
+        .returning(CV.id)
+    ).first()
+    
+    if deleted is None:
+        db.rollback()
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="CV not found"
         )
     
-    # Delete associated file
-    # (Skills and recommendations will be deleted via cascade)
-    db.delete(cv)
     db.commit()
+    invalidate_shared_reports(*share_tokens)
     
     return None
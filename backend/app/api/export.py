@@ -1,17 +1,67 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Response
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Response
 from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session, joinedload, selectinload
 from pydantic import BaseModel
 from typing import Optional, Dict, Any
 from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from pathlib import PurePath
+from urllib.parse import quote
+import json
+import multiprocessing
+import os
 import secrets
 
-from app.core.database import get_db
+from app.core.cache import (
+    get_redis,
+    invalidate_shared_reports,
+    shared_report_key,
+    shared_report_views_key
+)
+from app.core.config import settings
+from app.core.database import SessionLocal, get_db
 from app.models.models import CV, Skill, Recommendation, WorkExperience, SharedReport
-from app.services.pdf_exporter import PDFExporter
+from app.services.pdf_exporter import render_recommendations_report
 
 router = APIRouter(prefix="/export", tags=["Export"])
 
+# PDF rendering is CPU-bound, so it runs in worker processes rather than
+# tying up the request thread and the GIL; workers start on first use
+_PDF_POOL = ProcessPoolExecutor(
+    max_workers=os.cpu_count(),
+    mp_context=multiprocessing.get_context("spawn")
+)
+
+# PDFs are streamed back in 64KB chunks
+PDF_CHUNK_SIZE = 64 * 1024
+
+# Download name for exported reports; the stem comes from the uploaded CV
+PDF_FILENAME_TEMPLATE = "career_recommendations_{stem}.pdf"
+
+
+def _pdf_content_disposition(cv_filename: str) -> str:
+    """Build the attachment header for a report PDF named after the CV"""
+    filename = PDF_FILENAME_TEMPLATE.format(stem=PurePath(cv_filename).stem)
+    quoted = quote(filename)
+    if quoted == filename:
+        return f'attachment; filename="{filename}"'
+    # Non-ASCII or special characters: RFC 5987 encoding with an ASCII fallback
+    fallback = filename.encode("ascii", "ignore").decode().replace('"', "").replace("\\", "")
+    return f'attachment; filename="{fallback}"; filename*=utf-8\'\'{quoted}'
+
+
+def shutdown_pdf_pool():
+    """Stop the PDF worker processes"""
+    _PDF_POOL.shutdown(wait=False, cancel_futures=True)
+
+
+def _iter_chunks(buffer: BytesIO, chunk_size: int = PDF_CHUNK_SIZE):
+    """Yield a buffer in fixed-size chunks (iterating a BytesIO directly splits on newlines)"""
+    while chunk := buffer.read(chunk_size):
+        yield chunk
+
 
 # Pydantic models
 class ShareRequest(BaseModel):
@@ -46,18 +96,32 @@ def export_pdf(cv_id: int, db: Session = Depends(get_db)):
     Returns:
         PDF file as streaming response
     """
-    # Get CV
-    cv = db.query(CV).filter(CV.id == cv_id).first()
+    # Only the columns used in the report are selected, so no ORM objects
+    # are built and large text columns (raw_text, descriptions) stay in the DB
+    cv = db.execute(
+        select(CV.filename, CV.upload_date, CV.years_experience, CV.education_level)
+        .where(CV.id == cv_id)
+    ).first()
     if not cv:
         raise HTTPException(status_code=404, detail="CV not found")
     
     # Get skills
-    skills = db.query(Skill).filter(Skill.cv_id == cv_id).all()
+    skills = db.execute(
+        select(Skill.skill_name, Skill.skill_category, Skill.confidence_score)
+        .where(Skill.cv_id == cv_id)
+    ).all()
     
     # Get recommendations
-    recommendations = db.query(Recommendation).filter(
-        Recommendation.cv_id == cv_id
-    ).order_by(Recommendation.match_score.desc()).all()
+    recommendations = db.execute(
+        select(
+            Recommendation.pathway,
+            Recommendation.match_score,
+            Recommendation.reasoning,
+            Recommendation.recommended_skills
+        )
+        .where(Recommendation.cv_id == cv_id)
+        .order_by(Recommendation.match_score.desc())
+    ).all()
     
     if not recommendations:
         raise HTTPException(
@@ -66,8 +130,9 @@ def export_pdf(cv_id: int, db: Session = Depends(get_db)):
         )
     
     # Get work experiences
-    work_experiences = db.query(WorkExperience).filter(
-        WorkExperience.cv_id == cv_id
+    work_experiences = db.execute(
+        select(WorkExperience.job_title, WorkExperience.company_name, WorkExperience.duration_months)
+        .where(WorkExperience.cv_id == cv_id)
     ).all()
     
     # Prepare data
@@ -100,7 +165,7 @@ def export_pdf(cv_id: int, db: Session = Depends(get_db)):
                 "pathway": rec.pathway,
                 "match_score": rec.match_score,
                 "reasoning": rec.reasoning,
-                "recommended_skills": rec.recommended_skills.split(",") if rec.recommended_skills else [],
+                "recommended_skills": rec.recommended_skills or [],
                 "description": ""
             }
             for rec in recommendations
@@ -108,19 +173,19 @@ def export_pdf(cv_id: int, db: Session = Depends(get_db)):
     }
     
     # Generate PDF
-    exporter = PDFExporter()
     try:
-        pdf_buffer = exporter.generate_recommendations_report(
-            recommendations_data=recommendations_data,
-            cv_data=cv_data
-        )
+        pdf_bytes = _PDF_POOL.submit(
+            render_recommendations_report,
+            recommendations_data,
+            cv_data
+        ).result()
         
         # Return as streaming response
         return StreamingResponse(
-            pdf_buffer,
+            _iter_chunks(BytesIO(pdf_bytes)),
             media_type="application/pdf",
             headers={
-                "Content-Disposition": f"attachment; filename=career_recommendations_{cv.filename.split('.')[0]}.pdf"
+                "Content-Disposition": _pdf_content_disposition(cv.filename)
             }
         )
     except Exception as e:
@@ -175,6 +240,7 @@ def create_share_link(
             existing_share.expires_at = datetime.utcnow() + timedelta(days=share_request.expires_in_days)
             db.commit()
             db.refresh(existing_share)
+            invalidate_shared_reports(existing_share.share_token)
         
         return {
             "share_code": existing_share.share_token,
@@ -214,20 +280,82 @@ def create_share_link(
     }
 
 
+def _take_cached_views(token: str) -> int:
+    """Collect and reset the views counted while a shared report was served from cache"""
+    cache = get_redis()
+    if cache is None:
+        return 0
+    
+    try:
+        pending = cache.getdel(shared_report_views_key(token))
+    except Exception as e:
+        print(f"Reading cached view count failed: {e}")
+        return 0
+    
+    return int(pending) if pending else 0
+
+
+def _increment_view_count(shared_report_id: int, token: str):
+    """Atomically bump a shared report's view count in its own session"""
+    views = 1 + _take_cached_views(token)
+    
+    db = SessionLocal()
+    try:
+        db.execute(
+            update(SharedReport)
+            .where(SharedReport.id == shared_report_id)
+            .values(view_count=SharedReport.view_count + views)
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
 @router.get("/shared/{token}", response_model=SharedReportResponse)
-def get_shared_report(token: str, db: Session = Depends(get_db)):
+def get_shared_report(
+    token: str,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db)
+):
     """
     Get a shared report by token (public access).
     
     Args:
         token: Share token
+        background_tasks: Tasks run after the response is sent
         db: Database session
         
     Returns:
         Public view of recommendations
     """
-    # Find shared report
-    shared_report = db.query(SharedReport).filter(
+    # Serve straight from the cache when possible; the view is counted in
+    # Redis and folded into view_count on the next database-backed request
+    cache = get_redis()
+    if cache is not None:
+        try:
+            cached_report = cache.get(shared_report_key(token))
+            if cached_report is not None:
+                cache.incr(shared_report_views_key(token))
+                return Response(content=cached_report, media_type="application/json")
+        except Exception as e:
+            print(f"Shared report cache read failed: {e}")
+    
+    # Find shared report, loading the CV and its related rows up front
+    shared_report = db.query(SharedReport).options(
+        joinedload(SharedReport.cv).load_only(CV.filename),
+        joinedload(SharedReport.cv).selectinload(CV.skills).load_only(
+            Skill.skill_name, Skill.skill_category
+        ),
+        joinedload(SharedReport.cv).selectinload(CV.recommendations).load_only(
+            Recommendation.pathway,
+            Recommendation.match_score,
+            Recommendation.reasoning,
+            Recommendation.recommended_skills
+        ),
+        joinedload(SharedReport.cv).selectinload(CV.work_experiences).load_only(
+            WorkExperience.job_title, WorkExperience.company_name, WorkExperience.duration_months
+        )
+    ).filter(
         SharedReport.share_token == token
     ).first()
     
@@ -238,36 +366,22 @@ def get_shared_report(token: str, db: Session = Depends(get_db)):
     if shared_report.expires_at and shared_report.expires_at < datetime.utcnow():
         raise HTTPException(status_code=410, detail="This shared link has expired")
     
-    # Increment view count
-    shared_report.view_count += 1
-    db.commit()
-    
-    # Get CV data
-    cv = db.query(CV).filter(CV.id == shared_report.cv_id).first()
+    cv = shared_report.cv
     if not cv:
         raise HTTPException(status_code=404, detail="CV not found")
     
-    # Get skills
-    skills = db.query(Skill).filter(Skill.cv_id == shared_report.cv_id).all()
-    
-    # Get recommendations
-    recommendations = db.query(Recommendation).filter(
-        Recommendation.cv_id == shared_report.cv_id
-    ).order_by(Recommendation.match_score.desc()).all()
+    skills = cv.skills
+    recommendations = sorted(cv.recommendations, key=lambda rec: rec.match_score, reverse=True)
+    work_experiences = cv.work_experiences
     
-    # Get work experiences (optional, for context)
-    work_experiences = db.query(WorkExperience).filter(
-        WorkExperience.cv_id == shared_report.cv_id
-    ).all()
-    
-    return {
+    report = {
         "cv_filename": cv.filename,
         "recommendations": [
             {
                 "pathway": rec.pathway,
                 "match_score": rec.match_score,
                 "reasoning": rec.reasoning,
-                "recommended_skills": rec.recommended_skills.split(",") if rec.recommended_skills else []
+                "recommended_skills": rec.recommended_skills or []
             }
             for rec in recommendations
         ],
@@ -288,6 +402,22 @@ def get_shared_report(token: str, db: Session = Depends(get_db)):
         ],
         "generated_at": shared_report.created_at.isoformat()
     }
+    
+    if cache is not None:
+        # Never cache a report past its expiry date
+        ttl = settings.SHARED_REPORT_CACHE_TTL
+        if shared_report.expires_at:
+            ttl = min(ttl, int((shared_report.expires_at - datetime.utcnow()).total_seconds()))
+        if ttl > 0:
+            try:
+                cache.setex(shared_report_key(token), ttl, json.dumps(report))
+            except Exception as e:
+                print(f"Shared report cache write failed: {e}")
+    
+    # Increment view count after the response is sent
+    background_tasks.add_task(_increment_view_count, shared_report.id, token)
+    
+    return report
 
 
 @router.delete("/{cv_id}/share")
@@ -310,6 +440,8 @@ def delete_share_link(cv_id: int, db: Session = Depends(get_db)):
     if not shared_report:
         raise HTTPException(status_code=404, detail="No shared link found for this CV")
     
+    invalidate_shared_reports(shared_report.share_token)
+    
     db.delete(shared_report)
     db.commit()
     
@@ -336,6 +468,13 @@ def get_share_stats(cv_id: int, db: Session = Depends(get_db)):
     if not shared_report:
         return {"exists": False}
     
+    # Fold in any views served from the cache since the last flush
+    pending_views = _take_cached_views(shared_report.share_token)
+    if pending_views:
+        shared_report.view_count = SharedReport.view_count + pending_views
+        db.commit()
+        db.refresh(shared_report)
+    
     is_expired = shared_report.expires_at and shared_report.expires_at < datetime.utcnow()
     
     return {
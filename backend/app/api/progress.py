@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
@@ -59,6 +59,21 @@ class LearnedSkillResponse(BaseModel):
     status: str
 
 
+def _cv_exists(db: Session, cv_id: int) -> bool:
+    """Check a CV exists with an EXISTS probe instead of loading the full row"""
+    return db.query(db.query(CV.id).filter(CV.id == cv_id).exists()).scalar()
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    """Check whether the client already holds the version identified by etag"""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    # Weak comparison: W/"x" and "x" match
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag.removeprefix("W/") in candidates
+
+
 @router.post("/{cv_id}/snapshot", response_model=SnapshotResponse)
 def capture_progress_snapshot(cv_id: int, db: Session = Depends(get_db)):
     """
@@ -72,8 +87,7 @@ def capture_progress_snapshot(cv_id: int, db: Session = Depends(get_db)):
         Snapshot data
     """
     # Verify CV exists
-    cv = db.query(CV).filter(CV.id == cv_id).first()
-    if not cv:
+    if not _cv_exists(db, cv_id):
         raise HTTPException(status_code=404, detail="CV not found")
     
     # Capture snapshot
@@ -86,25 +100,45 @@ def capture_progress_snapshot(cv_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/{cv_id}/timeline", response_model=List[TimelineEntry])
-def get_progress_timeline(cv_id: int, db: Session = Depends(get_db)):
+def get_progress_timeline(
+    cv_id: int,
+    request: Request,
+    response: Response,
+    since: Optional[datetime] = None,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    db: Session = Depends(get_db)
+):
     """
     Get historical progress timeline for a CV.
     
+    Long histories can be fetched in pages: pass limit, then the date of
+    the last entry received as since for the next page. Responses carry an
+    ETag, so polling clients get a 304 without the timeline being read
+    while it is unchanged.
+    
     Args:
         cv_id: CV ID
+        request: Incoming request
+        response: Outgoing response
+        since: Only include entries dated after this
+        limit: Maximum number of entries to return
         db: Database session
         
     Returns:
         List of progress entries over time
     """
     # Verify CV exists
-    cv = db.query(CV).filter(CV.id == cv_id).first()
-    if not cv:
+    if not _cv_exists(db, cv_id):
         raise HTTPException(status_code=404, detail="CV not found")
     
-    # Get timeline
     tracker = ProgressTracker(db)
-    timeline = tracker.get_progress_timeline(cv_id)
+    etag = f'W/"{tracker.timeline_version(cv_id)}"'
+    if _etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    
+    # Get timeline
+    timeline = tracker.get_progress_timeline(cv_id, since=since, limit=limit)
     
     return timeline
 
@@ -122,8 +156,7 @@ def get_analytics(cv_id: int, db: Session = Depends(get_db)):
         Analytics data
     """
     # Verify CV exists
-    cv = db.query(CV).filter(CV.id == cv_id).first()
-    if not cv:
+    if not _cv_exists(db, cv_id):
         raise HTTPException(status_code=404, detail="CV not found")
     
     # Calculate analytics
@@ -151,8 +184,7 @@ def add_learned_skill(
         Learned skill data
     """
     # Verify CV exists
-    cv = db.query(CV).filter(CV.id == cv_id).first()
-    if not cv:
+    if not _cv_exists(db, cv_id):
         raise HTTPException(status_code=404, detail="CV not found")
     
     # Track skill
@@ -180,8 +212,7 @@ def get_learned_skills(cv_id: int, db: Session = Depends(get_db)):
         List of learned skills
     """
     # Verify CV exists
-    cv = db.query(CV).filter(CV.id == cv_id).first()
-    if not cv:
+    if not _cv_exists(db, cv_id):
         raise HTTPException(status_code=404, detail="CV not found")
     
     # Get learned skills
@@ -209,8 +240,7 @@ def delete_learned_skill(
         Success message
     """
     # Verify CV exists
-    cv = db.query(CV).filter(CV.id == cv_id).first()
-    if not cv:
+    if not _cv_exists(db, cv_id):
         raise HTTPException(status_code=404, detail="CV not found")
     
     # Delete skill
@@ -249,8 +279,7 @@ def update_learned_skill(
         Updated learned skill data
     """
     # Verify CV exists
-    cv = db.query(CV).filter(CV.id == cv_id).first()
-    if not cv:
+    if not _cv_exists(db, cv_id):
         raise HTTPException(status_code=404, detail="CV not found")
     
     # Update skill
@@ -1,15 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Header
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import exists, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime
+import json
 
-from app.core.database import get_db
-from app.core.security import decode_access_token
+from app.core.cache import static_json_response
+from app.core.database import async_session, get_async_db, get_db
+from app.core.security import get_current_user_id_optional, get_current_user_id_optional_async
 from app.core.config import settings
-from app.models.models import User, CV, Skill, Recommendation, WorkExperience
-from app.services.recommender import CareerRecommender
-from app.services.ai_enhancer import AIEnhancer
+from app.models.models import CV, Skill, Recommendation
+from app.services.recommender import CareerRecommender, get_recommender
+from app.services.ai_enhancer import AIEnhancer, get_ai_enhancer
+from app.services.recommendation_store import (
+    invalidate_cached_reports,
+    save_recommendations,
+    skills_to_dicts,
+    store_ai_insight,
+    work_experiences_to_dicts,
+)
 
 router = APIRouter(prefix="/recommendations", tags=["Recommendations"])
 
@@ -20,8 +32,9 @@ class RecommendationResponse(BaseModel):
     pathway: str
     match_score: float
     reasoning: Optional[str]
-    recommended_skills: Optional[str]
+    recommended_skills: Optional[List[str]]
     is_ai_enhanced: bool
+    ai_insight: Optional[Dict[str, Any]] = None
     created_at: datetime
     
     class Config:
@@ -53,29 +66,78 @@ class RecommendationResult(BaseModel):
     cv_id: int
     recommendations: List[PathwayRecommendation]
     total_skills: int
+    ai_enhancement_pending: bool = False
+
+
+class BatchRecommendationRequest(BaseModel):
+    cv_ids: List[int]
+    top_n: int = 10
+
 
+class BatchRecommendationResult(BaseModel):
+    batch_id: str
+    cv_ids: List[int]
 
-@router.post("/generate", response_model=RecommendationResult)
-def generate_recommendations(
+
+class BatchStatusResult(BaseModel):
+    batch_id: str
+    status: str
+    insights: Dict[int, Dict[str, Any]] = {}
+
+
+async def _enhance_and_store(
+    enhancer: AIEnhancer,
+    cv_id: int,
+    cv_text: str,
+    skills: List[Dict],
+    recommendations: List[Dict]
+):
+    """Background task: fetch AI insights for saved recommendations and store them"""
+    # The request session is closed by now, so this task opens its own
+    enhanced = await enhancer.enhance_recommendations(
+        cv_text,
+        skills,
+        [dict(rec) for rec in recommendations]
+    )
+    if not enhanced or not enhanced[0].get('is_ai_enhanced'):
+        return
+    
+    try:
+        async with async_session() as db:
+            await store_ai_insight(db, cv_id, enhanced[0]['ai_insight'])
+            await db.commit()
+            await invalidate_cached_reports(db, [cv_id])
+    except Exception as e:
+        print(f"Error storing AI insights for CV {cv_id}: {e}")
+
+
+@router.post("/generate", response_model=RecommendationResult, response_model_exclude_none=True)
+async def generate_recommendations(
     request: RecommendationRequest,
-    authorization: Optional[str] = Header(None),
-    db: Session = Depends(get_db)
+    background_tasks: BackgroundTasks,
+    current_user_id: Optional[int] = Depends(get_current_user_id_optional_async),
+    db: AsyncSession = Depends(get_async_db),
+    recommender: CareerRecommender = Depends(get_recommender),
+    enhancer: AIEnhancer = Depends(get_ai_enhancer)
 ):
-    """Generate career pathway recommendations for a CV (supports guest access)"""
-    
-    # Get current user if authenticated
-    current_user = None
-    if authorization and authorization.startswith("Bearer "):
-        token = authorization.replace("Bearer ", "")
-        email = decode_access_token(token)
-        if email:
-            current_user = db.query(User).filter(User.email == email).first()
-    
-    # Get CV (for authenticated users, verify ownership; for guests, allow any CV)
-    if current_user:
-        cv = db.query(CV).filter(CV.id == request.cv_id, CV.user_id == current_user.id).first()
-    else:
-        cv = db.query(CV).filter(CV.id == request.cv_id).first()
+    """
+    Generate career pathway recommendations for a CV (supports guest access).
+    
+    Base recommendations are returned right away. With use_ai, AI insights are
+    fetched in the background and stored on the top recommendation; poll
+    GET /cv/{cv_id} until it is marked as AI-enhanced.
+    """
+    
+    # Get CV with its skills and work experiences in one round of queries
+    # (for authenticated users, verify ownership; for guests, allow any CV)
+    stmt = (
+        select(CV)
+        .options(selectinload(CV.skills), selectinload(CV.work_experiences))
+        .where(CV.id == request.cv_id)
+    )
+    if current_user_id:
+        stmt = stmt.where(CV.user_id == current_user_id)
+    cv = (await db.execute(stmt)).scalar_one_or_none()
     
     if not cv:
         raise HTTPException(
@@ -83,8 +145,7 @@ def generate_recommendations(
             detail="CV not found"
         )
     
-    # Get skills for this CV
-    skills = db.query(Skill).filter(Skill.cv_id == request.cv_id).all()
+    skills = cv.skills
     
     if not skills:
         raise HTTPException(
@@ -92,102 +153,192 @@ def generate_recommendations(
             detail="No skills found for this CV. Please upload and analyze a CV first."
         )
     
-    # Get work experiences for this CV
-    work_experiences = db.query(WorkExperience).filter(WorkExperience.cv_id == request.cv_id).all()
-    
-    # Convert skills to dictionary format
-    skill_dicts = [
-        {
-            'name': skill.skill_name,
-            'category': skill.skill_category,
-            'level': skill.skill_level,
-            'confidence': skill.confidence_score
-        }
-        for skill in skills
-    ]
-    
-    # Convert work experiences to dictionary format
-    work_exp_dicts = [
-        {
-            'job_title': exp.job_title,
-            'company_name': exp.company_name,
-            'start_date': exp.start_date,
-            'end_date': exp.end_date,
-            'duration_months': exp.duration_months,
-            'description': exp.description,
-            'technologies_used': exp.technologies_used,
-            'is_current': exp.is_current
-        }
-        for exp in work_experiences
-    ]
+    skill_dicts = skills_to_dicts(skills)
     
     # Generate base recommendations (now with work experience)
-    recommender = CareerRecommender()
     # Very lenient threshold to show more career options
     recommendations = recommender.recommend_pathways(
         skill_dicts, 
-        work_experiences=work_exp_dicts, 
+        work_experiences=work_experiences_to_dicts(cv.work_experiences), 
         top_n=request.top_n,
         min_score=0.05  # Very lenient - show paths with even 5% match
     )
     
-    # Enhance with AI if requested
-    if request.use_ai and settings.USE_AI_ENHANCEMENT:
-        enhancer = AIEnhancer()
-        recommendations = enhancer.enhance_recommendations(
+    # Save recommendations to database
+    await save_recommendations(db, request.cv_id, recommendations)
+    await db.commit()
+    
+    await invalidate_cached_reports(db, [request.cv_id])
+    
+    # Enhance with AI if requested, after the response has been sent (skipped
+    # when no pathway matched, as there is nothing to enhance)
+    ai_enhancement_pending = bool(
+        request.use_ai and enhancer.enabled and enhancer.async_client and recommendations
+    )
+    if ai_enhancement_pending:
+        background_tasks.add_task(
+            _enhance_and_store,
+            enhancer,
+            request.cv_id,
             cv.raw_text or "",
             skill_dicts,
             recommendations
         )
     
-    # Save recommendations to database
-    # First, delete old recommendations for this CV
-    db.query(Recommendation).filter(Recommendation.cv_id == request.cv_id).delete()
-    
-    # Save new recommendations
-    for rec_data in recommendations:
-        recommendation = Recommendation(
-            cv_id=request.cv_id,
-            pathway=rec_data['pathway'],
-            match_score=rec_data['match_score'],
-            reasoning=rec_data.get('reasoning', ''),
-            recommended_skills=','.join(rec_data.get('recommended_skills', [])),
-            is_ai_enhanced=rec_data.get('is_ai_enhanced', False)
+    return {
+        "cv_id": request.cv_id,
+        "recommendations": recommendations,
+        "total_skills": len(skills),
+        "ai_enhancement_pending": ai_enhancement_pending
+    }
+
+
+@router.post("/generate-batch", response_model=BatchRecommendationResult, status_code=status.HTTP_202_ACCEPTED)
+async def generate_recommendations_batch(
+    request: BatchRecommendationRequest,
+    current_user_id: Optional[int] = Depends(get_current_user_id_optional_async),
+    db: AsyncSession = Depends(get_async_db),
+    recommender: CareerRecommender = Depends(get_recommender),
+    enhancer: AIEnhancer = Depends(get_ai_enhancer)
+):
+    """
+    Regenerate recommendations for several CVs with AI insights from the
+    OpenAI Batch API (requires authentication and an OpenAI API key).
+    
+    Base recommendations are saved right away; poll GET /batch/{batch_id}
+    for the AI insights, which arrive within 24 hours at half the cost of
+    interactive enhancement.
+    """
+    if not settings.USE_AI_ENHANCEMENT:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="AI enhancement is not enabled"
+        )
+    
+    if current_user_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Authentication required for batch recommendations"
+        )
+    
+    cvs = (
+        await db.execute(
+            select(CV)
+            .options(selectinload(CV.skills), selectinload(CV.work_experiences))
+            .where(CV.id.in_(request.cv_ids), CV.user_id == current_user_id)
+        )
+    ).scalars().all()
+    
+    jobs = {}
+    for cv in cvs:
+        if not cv.skills:
+            continue
+        
+        skill_dicts = skills_to_dicts(cv.skills)
+        recommendations = recommender.recommend_pathways(
+            skill_dicts,
+            work_experiences=work_experiences_to_dicts(cv.work_experiences),
+            top_n=request.top_n,
+            min_score=0.05
+        )
+        await save_recommendations(db, cv.id, recommendations)
+        if recommendations:
+            jobs[f"cv-{cv.id}"] = (cv.raw_text or "", skill_dicts, recommendations)
+    
+    if not jobs:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No CVs with recommendations to enhance found"
         )
-        db.add(recommendation)
     
-    db.commit()
+    batch_id = await enhancer.submit_enhancement_batch(
+        jobs,
+        metadata={"user_id": str(current_user_id)}
+    )
+    if not batch_id:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to submit AI enhancement batch"
+        )
+    
+    await db.commit()
+    
+    cv_ids = [int(custom_id[len("cv-"):]) for custom_id in jobs]
+    await invalidate_cached_reports(db, cv_ids)
     
     return {
-        "cv_id": request.cv_id,
-        "recommendations": recommendations,
-        "total_skills": len(skills)
+        "batch_id": batch_id,
+        "cv_ids": cv_ids
     }
 
 
-@router.get("/cv/{cv_id}", response_model=List[RecommendationResponse])
+@router.get("/batch/{batch_id}", response_model=BatchStatusResult)
+async def get_recommendations_batch(
+    batch_id: str,
+    current_user_id: Optional[int] = Depends(get_current_user_id_optional_async),
+    db: AsyncSession = Depends(get_async_db),
+    enhancer: AIEnhancer = Depends(get_ai_enhancer)
+):
+    """
+    Check a batch started by POST /generate-batch. Once it has completed, the
+    AI insights are returned per CV and stored on each CV's top recommendation.
+    """
+    if current_user_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Authentication required for batch recommendations"
+        )
+    
+    batch = await enhancer.get_enhancement_batch(batch_id)
+    if batch is None or (batch.metadata or {}).get("user_id") != str(current_user_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Batch not found"
+        )
+    
+    if batch.status != "completed":
+        return {"batch_id": batch_id, "status": batch.status}
+    
+    insights = {
+        int(custom_id[len("cv-"):]): ai_data
+        for custom_id, ai_data in (await enhancer.read_enhancement_batch(batch)).items()
+    }
+    
+    if insights:
+        # Store each CV's insights on its best recommendation, as the
+        # interactive path does
+        owned_cv_ids = (
+            await db.execute(
+                select(CV.id).where(CV.id.in_(insights), CV.user_id == current_user_id)
+            )
+        ).scalars().all()
+        for cv_id in owned_cv_ids:
+            await store_ai_insight(db, cv_id, insights[cv_id])
+        await db.commit()
+        await invalidate_cached_reports(db, owned_cv_ids)
+    
+    return {
+        "batch_id": batch_id,
+        "status": batch.status,
+        "insights": insights
+    }
+
+
+@router.get("/cv/{cv_id}", response_model=List[RecommendationResponse], response_model_exclude_none=True)
 def get_cv_recommendations(
     cv_id: int,
-    authorization: Optional[str] = Header(None),
+    current_user_id: Optional[int] = Depends(get_current_user_id_optional),
     db: Session = Depends(get_db)
 ):
     """Get saved recommendations for a CV (supports guest access)"""
     
-    # Get current user if authenticated
-    current_user = None
-    if authorization and authorization.startswith("Bearer "):
-        token = authorization.replace("Bearer ", "")
-        email = decode_access_token(token)
-        if email:
-            current_user = db.query(User).filter(User.email == email).first()
-    
     # Verify CV exists (for authenticated users, verify ownership; for guests, allow any CV)
-    if current_user:
-        cv = db.query(CV).filter(CV.id == cv_id, CV.user_id == current_user.id).first()
-    else:
-        cv = db.query(CV).filter(CV.id == cv_id).first()
+    # with an EXISTS check, so the CV row and its raw text are never loaded
+    cv_filter = exists().where(CV.id == cv_id)
+    if current_user_id:
+        cv_filter = cv_filter.where(CV.user_id == current_user_id)
     
-    if not cv:
+    if not db.scalar(select(cv_filter)):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="CV not found"
@@ -201,70 +352,67 @@ def get_cv_recommendations(
 
 
 @router.get("/pathways", response_model=List[Dict[str, Any]])
-def get_all_pathways():
+def get_all_pathways(recommender: CareerRecommender = Depends(get_recommender)):
     """Get all available career pathways"""
-    recommender = CareerRecommender()
-    pathways = recommender.get_all_pathways()
-    
-    return pathways
+    return static_json_response("pathways", recommender.get_all_pathways)
 
 
 @router.get("/pathway/{pathway_name}", response_model=Dict[str, Any])
-def get_pathway_details(pathway_name: str):
+def get_pathway_details(
+    pathway_name: str,
+    recommender: CareerRecommender = Depends(get_recommender)
+):
     """Get details about a specific career pathway"""
-    recommender = CareerRecommender()
-    pathway = recommender.get_pathway_by_name(pathway_name)
-    
-    if not pathway:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Pathway not found"
-        )
-    
-    return pathway
+    def build():
+        pathway = recommender.get_pathway_by_name(pathway_name)
+        
+        if not pathway:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Pathway not found"
+            )
+        
+        return pathway
+    
+    return static_json_response(f"pathway:{pathway_name.lower()}", build)
 
 
-@router.post("/ai/learning-path")
-def generate_learning_path(
+async def _learning_path_skills(
+    db: AsyncSession,
     cv_id: int,
     target_pathway: str,
-    authorization: Optional[str] = Header(None),
-    db: Session = Depends(get_db)
-):
-    """Generate AI-powered learning path (requires OpenAI API key, supports guest access)"""
-    
+    current_user_id: Optional[int],
+    recommender: CareerRecommender
+) -> Tuple[List[str], List[str]]:
+    """Get a CV's skills and the target pathway's skills it is missing"""
     if not settings.USE_AI_ENHANCEMENT:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="AI enhancement is not enabled"
         )
     
-    # Get current user if authenticated
-    current_user = None
-    if authorization and authorization.startswith("Bearer "):
-        token = authorization.replace("Bearer ", "")
-        email = decode_access_token(token)
-        if email:
-            current_user = db.query(User).filter(User.email == email).first()
-    
-    # Verify CV exists (for authenticated users, verify ownership; for guests, allow any CV)
-    if current_user:
-        cv = db.query(CV).filter(CV.id == cv_id, CV.user_id == current_user.id).first()
-    else:
-        cv = db.query(CV).filter(CV.id == cv_id).first()
+    # Verify CV exists and get its skills in one query (for authenticated users,
+    # verify ownership; for guests, allow any CV); a CV without skills comes
+    # back as a single row with a NULL skill name
+    stmt = (
+        select(Skill.skill_name)
+        .select_from(CV)
+        .outerjoin(Skill, Skill.cv_id == CV.id)
+        .where(CV.id == cv_id)
+    )
+    if current_user_id:
+        stmt = stmt.where(CV.user_id == current_user_id)
+    rows = (await db.execute(stmt)).all()
     
-    if not cv:
+    if not rows:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="CV not found"
         )
     
-    # Get skills
-    skills = db.query(Skill).filter(Skill.cv_id == cv_id).all()
-    current_skills = [skill.skill_name for skill in skills]
+    current_skills = [skill_name for (skill_name,) in rows if skill_name is not None]
     
     # Get target pathway
-    recommender = CareerRecommender()
     pathway = recommender.get_pathway_by_name(target_pathway)
     
     if not pathway:
@@ -275,12 +423,29 @@ def generate_learning_path(
     
     # Get missing skills
     all_pathway_skills = pathway.get('required_skills', []) + pathway.get('optional_skills', [])
-    current_skills_lower = [s.lower() for s in current_skills]
+    current_skills_lower = {s.lower() for s in current_skills}
     missing_skills = [s for s in all_pathway_skills if s.lower() not in current_skills_lower]
     
+    return current_skills, missing_skills
+
+
+@router.post("/ai/learning-path")
+async def generate_learning_path(
+    cv_id: int,
+    target_pathway: str,
+    current_user_id: Optional[int] = Depends(get_current_user_id_optional_async),
+    db: AsyncSession = Depends(get_async_db),
+    recommender: CareerRecommender = Depends(get_recommender),
+    enhancer: AIEnhancer = Depends(get_ai_enhancer)
+):
+    """Generate AI-powered learning path (requires OpenAI API key, supports guest access)"""
+    
+    current_skills, missing_skills = await _learning_path_skills(
+        db, cv_id, target_pathway, current_user_id, recommender
+    )
+    
     # Generate learning path with AI
-    enhancer = AIEnhancer()
-    learning_path = enhancer.generate_learning_path(
+    learning_path = await enhancer.generate_learning_path(
         current_skills[:15],
         target_pathway,
         missing_skills[:10]
@@ -298,3 +463,59 @@ def generate_learning_path(
         "missing_skills": missing_skills,
         "learning_path": learning_path
     }
+
+
+@router.post("/ai/learning-path/stream")
+async def stream_learning_path(
+    cv_id: int,
+    target_pathway: str,
+    current_user_id: Optional[int] = Depends(get_current_user_id_optional_async),
+    db: AsyncSession = Depends(get_async_db),
+    recommender: CareerRecommender = Depends(get_recommender),
+    enhancer: AIEnhancer = Depends(get_ai_enhancer)
+):
+    """
+    Stream an AI-powered learning path as Server-Sent Events (requires OpenAI
+    API key, supports guest access).
+    
+    Each event carries the next piece of generated text as {"token": ...}. A
+    final "done" event carries the skills the path was built from, or an
+    "error" event is sent if generation fails part-way.
+    """
+    current_skills, missing_skills = await _learning_path_skills(
+        db, cv_id, target_pathway, current_user_id, recommender
+    )
+    
+    # Fail before the stream starts, as the non-streaming endpoint does,
+    # rather than sending an empty path
+    if not enhancer.enabled or not enhancer.async_client:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to generate learning path"
+        )
+    
+    async def events():
+        try:
+            async for token in enhancer.stream_learning_path(
+                current_skills[:15],
+                target_pathway,
+                missing_skills[:10]
+            ):
+                yield f"data: {json.dumps({'token': token})}\n\n"
+        except Exception as e:
+            print(f"Error streaming learning path for CV {cv_id}: {e}")
+            yield f"event: error\ndata: {json.dumps({'detail': 'Failed to generate learning path'})}\n\n"
+            return
+        
+        done = {
+            "target_pathway": target_pathway,
+            "current_skills": current_skills,
+            "missing_skills": missing_skills
+        }
+        yield f"event: done\ndata: {json.dumps(done)}\n\n"
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,12 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 import json
 
+from app.core.cache import static_json_response
 from app.core.database import get_db
-from app.models.models import CV, Skill
-from app.services.roadmap_generator import RoadmapGenerator
+from app.models.models import CV, Skill, Recommendation
+from app.services.roadmap_generator import RoadmapGenerator, get_roadmap_generator
 
 router = APIRouter(prefix="/roadmap", tags=["Roadmap"])
 
@@ -39,7 +41,8 @@ class CertificationResponse(BaseModel):
 def get_learning_roadmap(
     cv_id: int,
     pathway: str,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    roadmap_generator: RoadmapGenerator = Depends(get_roadmap_generator)
 ):
     """
     Get a personalized learning roadmap for a specific career pathway.
@@ -61,7 +64,6 @@ def get_learning_roadmap(
     current_skills = [skill.skill_name for skill in skills]
     
     # Generate roadmap
-    roadmap_generator = RoadmapGenerator()
     roadmap = roadmap_generator.generate_roadmap(
         pathway=pathway,
         current_skills=current_skills,
@@ -72,7 +74,10 @@ def get_learning_roadmap(
 
 
 @router.get("/pathway/{pathway}/certifications", response_model=List[CertificationResponse])
-def get_certifications(pathway: str):
+def get_certifications(
+    pathway: str,
+    roadmap_generator: RoadmapGenerator = Depends(get_roadmap_generator)
+):
     """
     Get relevant certifications for a career pathway.
     
@@ -82,42 +87,26 @@ def get_certifications(pathway: str):
     Returns:
         List of relevant certifications
     """
-    roadmap_generator = RoadmapGenerator()
-    
-    # Get certifications for this pathway
-    certs = roadmap_generator.certifications.get(pathway, [])
+    def build():
+        certs = roadmap_generator.find_certifications(pathway)
+        return [CertificationResponse(**cert).model_dump(exclude_none=True) for cert in certs]
     
-    if not certs:
-        # Try to find similar pathway
-        for key in roadmap_generator.certifications.keys():
-            if pathway.lower() in key.lower() or key.lower() in pathway.lower():
-                certs = roadmap_generator.certifications[key]
-                break
-    
-    return certs
+    # Pathway names are matched case-insensitively, so share one cache entry
+    return static_json_response(f"certifications:{pathway.lower()}", build)
 
 
 @router.get("/pathways/all")
-def get_all_pathways():
+def get_all_pathways(roadmap_generator: RoadmapGenerator = Depends(get_roadmap_generator)):
     """
     Get list of all available career pathways.
     
     Returns:
         List of pathway names
     """
-    roadmap_generator = RoadmapGenerator()
-    
-    # Get pathways from pathways data
-    pathways = [path.get("name") for path in roadmap_generator.pathways_data.get("pathways", [])]
-    
-    # Also get pathways from certifications
-    cert_pathways = list(roadmap_generator.certifications.keys())
-    
-    # Combine and deduplicate
-    all_pathways = list(set(pathways + cert_pathways))
-    all_pathways.sort()
-    
-    return {"pathways": all_pathways}
+    return static_json_response(
+        "roadmap_pathways",
+        lambda: {"pathways": list(roadmap_generator.all_pathway_names)}
+    )
 
 
 @router.get("/{cv_id}/recommended-pathways")
@@ -132,17 +121,20 @@ def get_recommended_pathways(cv_id: int, db: Session = Depends(get_db)):
     Returns:
         List of recommended pathways
     """
-    # Get CV
-    cv = db.query(CV).filter(CV.id == cv_id).first()
-    if not cv:
+    # Check the CV and fetch its top recommendations in one query; a CV
+    # without recommendations comes back as a single row of NULLs
+    rows = db.execute(
+        select(Recommendation.pathway, Recommendation.match_score)
+        .select_from(CV)
+        .outerjoin(Recommendation, Recommendation.cv_id == CV.id)
+        .where(CV.id == cv_id)
+        .order_by(Recommendation.match_score.desc())
+        .limit(5)
+    ).all()
+    if not rows:
         raise HTTPException(status_code=404, detail="CV not found")
     
-    # Get recommendations (if they exist)
-    from app.models.models import Recommendation
-    recommendations = db.query(Recommendation).filter(
-        Recommendation.cv_id == cv_id
-    ).order_by(Recommendation.match_score.desc()).limit(5).all()
-    
+    recommendations = [row for row in rows if row.pathway is not None]
     if not recommendations:
         return {"pathways": []}
     
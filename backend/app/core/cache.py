@@ -0,0 +1,113 @@
+from typing import Any, Callable, Dict, Optional
+import hashlib
+import json
+import threading
+from cachetools import TTLCache
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from app.core.config import settings
+from app.core.serialization import json_dumps
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+_client = None
+
+# Responses built from the bundled pathway/certification data only change on
+# deploy, so they are encoded once per process and cached by clients too
+STATIC_CACHE_MAX_AGE = 3600  # seconds
+_static_responses = TTLCache(maxsize=256, ttl=STATIC_CACHE_MAX_AGE)
+_static_responses_lock = threading.Lock()
+
+# OpenAI completions keyed by their full request, so identical prompts (a CV
+# re-analysed, a learning path asked for again) skip the API round-trip; kept
+# in Redis when configured so every worker shares them
+LLM_RESPONSE_TTL = 7 * 24 * 3600  # seconds
+_llm_responses = TTLCache(maxsize=1024, ttl=LLM_RESPONSE_TTL)
+_llm_responses_lock = threading.Lock()
+
+
+def get_redis() -> Optional["redis.Redis"]:
+    """Get the shared Redis client, or None if Redis is not configured"""
+    global _client
+    if _client is None and REDIS_AVAILABLE and settings.REDIS_URL:
+        _client = redis.Redis.from_url(settings.REDIS_URL)
+    return _client
+
+
+def shared_report_key(token: str) -> str:
+    """Cache key for a rendered shared report"""
+    return f"shared_report:{token}"
+
+
+def shared_report_views_key(token: str) -> str:
+    """Counter key for shared report views served from the cache"""
+    return f"shared_report:{token}:views"
+
+
+def invalidate_shared_reports(*tokens: str) -> None:
+    """Drop cached shared reports so the next view is rebuilt from the database"""
+    cache = get_redis()
+    if cache is None or not tokens:
+        return
+
+    try:
+        cache.delete(*(shared_report_key(token) for token in tokens))
+    except Exception as e:
+        print(f"Shared report cache invalidation failed: {e}")
+
+
+def static_json_response(key: str, build: Callable[[], Any]) -> Response:
+    """Serve JSON for static reference data, building and encoding it once per key"""
+    with _static_responses_lock:
+        body = _static_responses.get(key)
+    
+    if body is None:
+        # build() may raise (e.g. a 404); errors are never cached
+        body = json.dumps(jsonable_encoder(build())).encode()
+        with _static_responses_lock:
+            _static_responses[key] = body
+    
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"Cache-Control": f"public, max-age={STATIC_CACHE_MAX_AGE}"}
+    )
+
+
+def llm_response_key(request: Dict[str, Any]) -> str:
+    """Cache key for a chat completion request (model, messages and sampling parameters)"""
+    digest = hashlib.sha256(json_dumps(request, sort_keys=True)).hexdigest()
+    return f"llm_response:{digest}"
+
+
+def get_llm_response(key: str) -> Optional[str]:
+    """Get a cached completion, or None if it is not cached"""
+    cache = get_redis()
+    if cache is not None:
+        try:
+            content = cache.get(key)
+            return content.decode() if content is not None else None
+        except Exception as e:
+            print(f"LLM response cache read failed: {e}")
+            return None
+    
+    with _llm_responses_lock:
+        return _llm_responses.get(key)
+
+
+def set_llm_response(key: str, content: str) -> None:
+    """Cache a completion for LLM_RESPONSE_TTL"""
+    cache = get_redis()
+    if cache is not None:
+        try:
+            cache.set(key, content, ex=LLM_RESPONSE_TTL)
+        except Exception as e:
+            print(f"LLM response cache write failed: {e}")
+        return
+    
+    with _llm_responses_lock:
+        _llm_responses[key] = content
@@ -12,6 +12,10 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str = "sqlite:///./career_projector.db"
+    POOL_SIZE: int = 20  # connections kept open per engine (ignored for SQLite)
+    MAX_OVERFLOW: int = 40  # extra connections allowed under burst load
+    POOL_TIMEOUT: int = 10  # seconds to wait for a free connection
+    POOL_RECYCLE: int = 1800  # seconds before a connection is replaced
     
     # Security
     SECRET_KEY: str = "your-secret-key-change-in-production"
@@ -21,6 +25,14 @@ class Settings(BaseSettings):
     # OpenAI API (Optional)
     OPENAI_API_KEY: Optional[str] = None
     USE_AI_ENHANCEMENT: bool = False
+    AI_MAX_CONCURRENT_REQUESTS: int = 20  # in-flight OpenAI calls per process
+    AI_REQUESTS_PER_MINUTE: int = 3500  # per process; match your OpenAI rate limits
+    AI_TOKENS_PER_MINUTE: int = 200000
+    AI_MAX_RETRIES: int = 5  # retries on 429/5xx, with exponential backoff
+    
+    # Redis cache (Optional)
+    REDIS_URL: Optional[str] = None
+    SHARED_REPORT_CACHE_TTL: int = 300  # seconds
     
     # File Upload
     UPLOAD_DIR: str = "./uploads"
@@ -1,17 +1,90 @@
+from functools import lru_cache
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
 
+
+
+def _engine_options() -> dict:
+    """Connection options shared by the sync and async engines"""
+    if "sqlite" in settings.DATABASE_URL:
+        # SQLite keeps SQLAlchemy's default pool
+        return {"connect_args": {"check_same_thread": False}}
+    
+    # Each engine holds up to POOL_SIZE + MAX_OVERFLOW connections per worker
+    # process, so with N Uvicorn workers the database sees up to
+    # 2 * N * (POOL_SIZE + MAX_OVERFLOW) connections (sync + async engine)
+    return {
+        "pool_size": settings.POOL_SIZE,
+        "max_overflow": settings.MAX_OVERFLOW,
+        "pool_timeout": settings.POOL_TIMEOUT,
+        "pool_recycle": settings.POOL_RECYCLE,
+        "pool_pre_ping": True
+    }
+
+
 # Create database engine
 engine = create_engine(
     settings.DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {}
+    insertmanyvalues_page_size=1000,
+    **_engine_options()
 )
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async drivers for the same database, used by endpoints that await remote
+# calls (and the package each one needs)
+ASYNC_DRIVERS = {
+    "sqlite": ("sqlite+aiosqlite", "aiosqlite"),
+    "postgresql": ("postgresql+asyncpg", "asyncpg"),
+}
+
+
+def _async_database_url(url: str):
+    """Swap the sync driver in DATABASE_URL for its async counterpart"""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise RuntimeError(
+            f"No async driver is configured for '{backend}' databases "
+            f"(supported: {', '.join(ASYNC_DRIVERS)})"
+        )
+    return url.set(drivername=ASYNC_DRIVERS[backend][0])
+
+
+@lru_cache(maxsize=1)
+def get_async_engine() -> AsyncEngine:
+    """
+    The async engine, created on first use so that a missing async driver
+    only affects the endpoints that need it rather than the whole app
+    """
+    url = _async_database_url(settings.DATABASE_URL)
+    try:
+        return create_async_engine(url, **_engine_options())
+    except ImportError as e:
+        package = ASYNC_DRIVERS[url.get_backend_name()][1]
+        raise RuntimeError(f"The async database driver is not installed (pip install {package}): {e}") from e
+
+
+@lru_cache(maxsize=1)
+def _async_session_factory() -> async_sessionmaker:
+    return async_sessionmaker(get_async_engine(), autoflush=False, expire_on_commit=False)
+
+
+def async_session() -> AsyncSession:
+    """Open an async database session (use with `async with`)"""
+    return _async_session_factory()()
+
+
+async def dispose_async_engine():
+    """Close the async engine's connections, if it was ever created"""
+    if get_async_engine.cache_info().currsize:
+        await get_async_engine().dispose()
+
 # Create base class for models
 Base = declarative_base()
 
@@ -25,6 +98,12 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    """Dependency to get an async database session"""
+    async with async_session() as db:
+        yield db
+
+
 def init_db():
     """Initialize database tables"""
     # Import models to register them with Base
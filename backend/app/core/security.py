@@ -1,12 +1,18 @@
 from datetime import datetime, timedelta
-from typing import Optional
+from functools import lru_cache
+from typing import Optional, Tuple
+import threading
+import time
+from cachetools import TTLCache
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Header, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.database import get_async_db, get_db
 from app.models.models import User
 
 # Password hashing
@@ -15,6 +21,10 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 # OAuth2 scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_PREFIX}/auth/login")
 
+# Token -> user id lookups, kept briefly so authenticated calls skip the User SELECT
+_user_id_cache = TTLCache(maxsize=10_000, ttl=60)
+_user_id_cache_lock = threading.Lock()
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash"""
@@ -39,19 +49,88 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
-def decode_access_token(token: str) -> Optional[str]:
-    """Decode a JWT access token"""
+@lru_cache(maxsize=1024)
+def _decode_token_claims(token: str) -> Optional[Tuple[str, Optional[int]]]:
+    """Decode a JWT once and keep its subject and expiry (tokens are immutable)"""
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            return None
-        return email
     except JWTError:
         return None
+    email: str = payload.get("sub")
+    if email is None:
+        return None
+    return email, payload.get("exp")
+
+
+def decode_access_token(token: str) -> Optional[str]:
+    """Decode a JWT access token"""
+    claims = _decode_token_claims(token)
+    if claims is None:
+        return None
+    email, expires_at = claims
+    # Cached claims outlive the decode, so expiry has to be re-checked here
+    if expires_at is not None and expires_at <= time.time():
+        return None
+    return email
+
+
+def _bearer_token(authorization: Optional[str]) -> Optional[str]:
+    """Extract the raw token from an optional Authorization header"""
+    if authorization and authorization.startswith("Bearer "):
+        return authorization.replace("Bearer ", "")
+    return None
 
 
-async def get_current_user(
+def _cached_user_id(token: str) -> Optional[int]:
+    """Get a token's user id from the cache"""
+    with _user_id_cache_lock:
+        return _user_id_cache.get(token)
+
+
+def _cache_user_id(token: str, user_id: Optional[int]) -> None:
+    """Remember a token's user id (unknown users are not cached)"""
+    if user_id is not None:
+        with _user_id_cache_lock:
+            _user_id_cache[token] = user_id
+
+
+def _resolve_user_id(token: str, db: Session) -> Optional[int]:
+    """Resolve a token to its user id, caching the lookup for a short TTL"""
+    email = decode_access_token(token)
+    if email is None:
+        return None
+    
+    user_id = _cached_user_id(token)
+    if user_id is not None:
+        return user_id
+    
+    user_id = db.query(User.id).filter(User.email == email).scalar()
+    _cache_user_id(token, user_id)
+    return user_id
+
+
+async def _resolve_user_id_async(token: str, db: AsyncSession) -> Optional[int]:
+    """Resolve a token to its user id with an async session (shares the cache)"""
+    email = decode_access_token(token)
+    if email is None:
+        return None
+    
+    user_id = _cached_user_id(token)
+    if user_id is not None:
+        return user_id
+    
+    user_id = (await db.execute(select(User.id).where(User.email == email))).scalar()
+    _cache_user_id(token, user_id)
+    return user_id
+
+
+def invalidate_cached_token(token: str) -> None:
+    """Drop a token from the user id cache (e.g. on logout)"""
+    with _user_id_cache_lock:
+        _user_id_cache.pop(token, None)
+
+
+def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db)
 ) -> User:
@@ -62,29 +141,57 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     
-    email = decode_access_token(token)
-    if email is None:
+    user_id = _resolve_user_id(token, db)
+    if user_id is None:
         raise credentials_exception
     
-    user = db.query(User).filter(User.email == email).first()
+    # Served from the session identity map when already loaded
+    user = db.get(User, user_id)
     if user is None:
         raise credentials_exception
     
     return user
 
 
-async def get_current_user_optional(
-    db: Session = Depends(get_db),
-    token: Optional[str] = None
+def get_current_user_optional(
+    authorization: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
 ) -> Optional[User]:
     """Get the current authenticated user, or None if not authenticated (for guest access)"""
-    try:
-        if token:
-            email = decode_access_token(token)
-            if email:
-                user = db.query(User).filter(User.email == email).first()
-                return user
-    except Exception:
-        pass
+    token = _bearer_token(authorization)
+    if token is None:
+        return None
+    
+    user_id = _resolve_user_id(token, db)
+    if user_id is None:
+        return None
+    
+    return db.get(User, user_id)
+
+
+def get_current_user_id_optional(
+    authorization: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+) -> Optional[int]:
+    """
+    Get the current user's id, or None for guests (skips hydrating the full User row).
+    A plain def like the other sync session dependencies, so FastAPI runs its
+    query in the threadpool instead of on the event loop.
+    """
+    token = _bearer_token(authorization)
+    if token is None:
+        return None
+    
+    return _resolve_user_id(token, db)
+
+
+async def get_current_user_id_optional_async(
+    authorization: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db)
+) -> Optional[int]:
+    """Get the current user's id, or None for guests (for routes on the async session)"""
+    token = _bearer_token(authorization)
+    if token is None:
+        return None
     
-    return None
\ No newline at end of file
+    return await _resolve_user_id_async(token, db)
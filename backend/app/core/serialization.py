@@ -0,0 +1,26 @@
+from typing import Any, Union
+import json
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def json_dumps(obj: Any, sort_keys: bool = False) -> bytes:
+    """Encode obj as compact UTF-8 JSON, with orjson when it is installed"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS if sort_keys else 0)
+    # Same output as orjson, so cache keys don't depend on which is installed
+    return json.dumps(
+        obj, sort_keys=sort_keys, separators=(",", ":"), ensure_ascii=False
+    ).encode()
+
+
+def json_loads(data: Union[str, bytes]) -> Any:
+    """Decode JSON, with orjson when it is installed (raises json.JSONDecodeError)"""
+    if ORJSON_AVAILABLE:
+        # orjson.JSONDecodeError subclasses json.JSONDecodeError
+        return orjson.loads(data)
+    return json.loads(data)
@@ -1,14 +1,42 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from app.core.config import settings
-from app.core.database import init_db
+from app.core.database import dispose_async_engine, engine, init_db
 from app.api import auth, cv, recommendations, roadmap, progress, export
+from app.services.ai_enhancer import get_ai_enhancer
+from app.services.recommender import get_recommender
+from app.services.roadmap_generator import get_roadmap_generator
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialize the database and shared services on startup, release them on shutdown"""
+    init_db()
+    print("Database initialized")
+    
+    # Load pathway data and build the score matrices now rather than on the
+    # first request each worker serves
+    get_recommender()
+    get_roadmap_generator()
+    enhancer = get_ai_enhancer()
+    
+    yield
+    
+    export.shutdown_pdf_pool()
+    cv.shutdown_parser_pool()
+    await enhancer.close()
+    await dispose_async_engine()
+    engine.dispose()
+
 
 # Create FastAPI application
 app = FastAPI(
     title=settings.APP_NAME,
     description="CV Career Path Recommendation API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS - Allow Vercel deployments and localhost
@@ -25,6 +53,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress larger JSON bodies (recommendations, roadmaps); small payloads are sent as-is
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # Include routers
 app.include_router(auth.router, prefix=settings.API_V1_PREFIX)
 app.include_router(cv.router, prefix=settings.API_V1_PREFIX)
@@ -34,13 +65,6 @@ app.include_router(progress.router, prefix=settings.API_V1_PREFIX)
 app.include_router(export.router, prefix=settings.API_V1_PREFIX)
 
 
-@app.on_event("startup")
-def startup_event():
-    """Initialize database on startup"""
-    init_db()
-    print("Database initialized")
-
-
 @app.get("/")
 def root():
     """Root endpoint"""
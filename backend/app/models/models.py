@@ -1,8 +1,14 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, Float, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Text, Float, ForeignKey, Boolean, Index, JSON, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.core.database import Base
 
+# CV processing states (uploads are parsed in the background)
+CV_STATUS_PENDING = "pending"
+CV_STATUS_COMPLETED = "completed"
+CV_STATUS_FAILED = "failed"
+
 
 class User(Base):
     """User model"""
@@ -21,13 +27,18 @@ class User(Base):
 class CV(Base):
     """CV model"""
     __tablename__ = "cvs"
+    __table_args__ = (
+        # Serves the per-user CV list ordered by newest upload
+        Index("ix_cvs_user_id_upload_date", "user_id", "upload_date"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)  # Made nullable for guest users
     filename = Column(String, nullable=False)
     upload_date = Column(DateTime, default=datetime.utcnow)
-    parsed_content = Column(Text, nullable=True)
+    parsed_content = Column(JSON().with_variant(JSONB, "postgresql"), nullable=True)  # CV sections keyed by name
     raw_text = Column(Text, nullable=True)
+    status = Column(String, nullable=False, default=CV_STATUS_COMPLETED, server_default=CV_STATUS_COMPLETED)
     
     # Analysis results
     years_experience = Column(Float, nullable=True)
@@ -49,7 +60,7 @@ class Skill(Base):
     __tablename__ = "skills"
     
     id = Column(Integer, primary_key=True, index=True)
-    cv_id = Column(Integer, ForeignKey("cvs.id"), nullable=False)
+    cv_id = Column(Integer, ForeignKey("cvs.id"), nullable=False, index=True)
     skill_name = Column(String, nullable=False)
     skill_category = Column(String, nullable=True)  # e.g., "frontend", "backend", "devops"
     skill_level = Column(String, nullable=True)  # e.g., "beginner", "intermediate", "expert"
@@ -64,7 +75,7 @@ class WorkExperience(Base):
     __tablename__ = "work_experiences"
     
     id = Column(Integer, primary_key=True, index=True)
-    cv_id = Column(Integer, ForeignKey("cvs.id"), nullable=False)
+    cv_id = Column(Integer, ForeignKey("cvs.id"), nullable=False, index=True)
     job_title = Column(String, nullable=False)
     company_name = Column(String, nullable=True)
     start_date = Column(String, nullable=True)  # Stored as string since we parse from CVs
@@ -86,15 +97,26 @@ class WorkExperience(Base):
 class Recommendation(Base):
     """Career pathway recommendation model"""
     __tablename__ = "recommendations"
+    __table_args__ = (
+        # Serves "recommendations for a CV by best match" without a sort; on
+        # PostgreSQL it also covers the top-pathways lookup (index-only scan)
+        Index(
+            "ix_recommendations_cv_id_match_score_desc",
+            "cv_id",
+            text("match_score DESC"),
+            postgresql_include=["pathway"]
+        ),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     cv_id = Column(Integer, ForeignKey("cvs.id"), nullable=False)
     pathway = Column(String, nullable=False)  # e.g., "Frontend Developer", "DevOps Engineer"
     match_score = Column(Float, nullable=False)  # 0.0 to 1.0
     reasoning = Column(Text, nullable=True)
-    recommended_skills = Column(Text, nullable=True)  # JSON string of skills to learn
+    recommended_skills = Column(JSON().with_variant(JSONB, "postgresql"), nullable=True)  # List of skills to learn
     created_at = Column(DateTime, default=datetime.utcnow)
     is_ai_enhanced = Column(Boolean, default=False)
+    ai_insight = Column(JSON().with_variant(JSONB, "postgresql"), nullable=True)  # Set on the top recommendation when AI-enhanced
     
     # Relationships
     cv = relationship("CV", back_populates="recommendations")
@@ -131,14 +153,18 @@ class CVVersion(Base):
 class ProgressEntry(Base):
     """Progress tracking model"""
     __tablename__ = "progress_entries"
+    __table_args__ = (
+        # Serves a CV's entries in date order (and its latest entry) without a sort
+        Index("ix_progress_entries_cv_id_date", "cv_id", "date"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     cv_id = Column(Integer, ForeignKey("cvs.id"), nullable=False)
     date = Column(DateTime, default=datetime.utcnow)
     skills_count = Column(Integer, nullable=False)
     top_match_score = Column(Float, nullable=True)
-    skills_learned = Column(Text, nullable=True)  # JSON array of new skills
-    metrics = Column(Text, nullable=True)  # JSON with various metrics
+    skills_learned = Column(JSON().with_variant(JSONB, "postgresql"), nullable=True)  # List of new skills
+    metrics = Column(JSON().with_variant(JSONB, "postgresql"), nullable=True)  # Dict of various metrics
     
     # Relationships
     cv = relationship("CV", back_populates="progress_entries")
@@ -147,6 +173,10 @@ class ProgressEntry(Base):
 class LearnedSkill(Base):
     """Learned skills tracking model"""
     __tablename__ = "learned_skills"
+    __table_args__ = (
+        # Serves a CV's learned skills ordered by date without a sort
+        Index("ix_learned_skills_cv_id_date_learned", "cv_id", "date_learned"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     cv_id = Column(Integer, ForeignKey("cvs.id"), nullable=False)
@@ -164,7 +194,7 @@ class SharedReport(Base):
     __tablename__ = "shared_reports"
     
     id = Column(Integer, primary_key=True, index=True)
-    cv_id = Column(Integer, ForeignKey("cvs.id"), nullable=False)
+    cv_id = Column(Integer, ForeignKey("cvs.id"), nullable=False, index=True)
     share_token = Column(String, unique=True, index=True, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     expires_at = Column(DateTime, nullable=True)
@@ -1,13 +1,81 @@
-from typing import List, Dict, Optional
+from typing import AsyncIterator, List, Dict, Optional, Tuple
+import asyncio
 import json
+import time
+from functools import lru_cache
+from app.core.cache import get_llm_response, llm_response_key, set_llm_response
 from app.core.config import settings
+from app.core.serialization import json_dumps, json_loads
 
 try:
-    from openai import OpenAI
+    import httpx
+    from openai import AsyncOpenAI
     OPENAI_AVAILABLE = True
 except ImportError:
     OPENAI_AVAILABLE = False
 
+try:
+    import h2  # noqa
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Idle OpenAI connections are kept open this long for the next call
+AI_KEEPALIVE_SECONDS = 60
+
+# Batch API requests enhance this many CVs each, so the instructions and
+# system prompt are sent once per group rather than once per CV
+CVS_PER_BATCH_REQUEST = 5
+
+ENHANCEMENT_SYSTEM_PROMPT = "You are an expert career counselor helping people find the right career path based on their skills and experience."
+
+ENHANCEMENT_POINTS = """1. A brief analysis of the candidate's career profile
+2. Which of the suggested pathways seems most suitable and why
+3. Any additional career paths that might be worth considering
+4. Key skills they should focus on developing next"""
+
+ENHANCEMENT_KEYS = "profile_analysis, best_pathway, additional_pathways, development_focus"
+
+
+class RateLimiter:
+    """Requests- and tokens-per-minute budgets, refilled continuously (token buckets)"""
+    
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._requests = float(requests_per_minute)
+        self._tokens = float(tokens_per_minute)
+        self._updated = time.monotonic()
+        # Waiters queue on the lock, so budget is handed out in arrival order
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self, tokens: int):
+        """Wait until one request using about `tokens` tokens fits in the budget"""
+        tokens = min(tokens, self.tokens_per_minute)
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                elapsed = now - self._updated
+                self._updated = now
+                self._requests = min(
+                    self.requests_per_minute,
+                    self._requests + elapsed * self.requests_per_minute / 60
+                )
+                self._tokens = min(
+                    self.tokens_per_minute,
+                    self._tokens + elapsed * self.tokens_per_minute / 60
+                )
+                
+                if self._requests >= 1 and self._tokens >= tokens:
+                    self._requests -= 1
+                    self._tokens -= tokens
+                    return
+                
+                await asyncio.sleep(max(
+                    (1 - self._requests) * 60 / self.requests_per_minute,
+                    (tokens - self._tokens) * 60 / self.tokens_per_minute
+                ))
+
 
 class AIEnhancer:
     """Service for AI-enhanced career recommendations using OpenAI"""
@@ -16,11 +84,149 @@ class AIEnhancer:
         self.enabled = settings.USE_AI_ENHANCEMENT and OPENAI_AVAILABLE
         
         if self.enabled and settings.OPENAI_API_KEY:
-            self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
+            # The client retries 429s and 5xx errors itself, backing off
+            # exponentially and honouring Retry-After. Its connections are
+            # kept alive between calls so TLS handshakes are paid once, and
+            # with h2 installed concurrent calls share HTTP/2 connections
+            self.async_client = AsyncOpenAI(
+                api_key=settings.OPENAI_API_KEY,
+                max_retries=settings.AI_MAX_RETRIES,
+                # Built with httpx directly (DefaultAsyncHttpxClient needs a newer
+                # SDK); redirects are followed as the SDK's own client does
+                http_client=httpx.AsyncClient(
+                    http2=HTTP2_AVAILABLE,
+                    follow_redirects=True,
+                    limits=httpx.Limits(
+                        max_connections=settings.AI_MAX_CONCURRENT_REQUESTS,
+                        max_keepalive_connections=settings.AI_MAX_CONCURRENT_REQUESTS,
+                        keepalive_expiry=AI_KEEPALIVE_SECONDS
+                    )
+                )
+            )
         else:
-            self.client = None
+            self.async_client = None
+        
+        # Caps in-flight OpenAI calls across concurrent requests to stay under the rate limit
+        self._request_slots = asyncio.Semaphore(settings.AI_MAX_CONCURRENT_REQUESTS)
+        self._rate_limiter = RateLimiter(
+            settings.AI_REQUESTS_PER_MINUTE,
+            settings.AI_TOKENS_PER_MINUTE
+        )
+        
+        # Completions served from the response cache vs. requested from OpenAI
+        self.cache_stats = {"hits": 0, "misses": 0}
+    
+    async def close(self):
+        """Close the OpenAI client and its connection pool"""
+        if self.async_client:
+            await self.async_client.close()
+    
+    @staticmethod
+    def _cv_context(cv_text: str, skills: List[Dict], base_recommendations: List[Dict]) -> str:
+        """Describe a CV's skills, matched pathways and text for an enhancement prompt"""
+        skill_list = ", ".join([s['name'] for s in skills[:20]])
+        pathway_list = "\n".join([
+            f"- {r['pathway']} (Score: {r['match_score']})"
+            for r in base_recommendations[:5]
+        ])
+        
+        return f"""Skills identified: {skill_list}
+
+Top career pathways matched:
+{pathway_list}
+
+CV Summary: {cv_text[:1000]}..."""
     
-    def enhance_recommendations(
+    def _enhancement_request(
+        self,
+        cv_text: str,
+        skills: List[Dict],
+        base_recommendations: List[Dict]
+    ) -> Dict:
+        """Build the chat completion parameters for a recommendation enhancement"""
+        prompt = f"""Based on the following CV information, provide career insights and recommendations.
+
+{self._cv_context(cv_text, skills, base_recommendations)}
+
+Please provide:
+{ENHANCEMENT_POINTS}
+
+Format your response as JSON with keys: {ENHANCEMENT_KEYS}"""
+
+        return {
+            "model": "gpt-3.5-turbo",
+            "messages": [
+                {"role": "system", "content": ENHANCEMENT_SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            "response_format": {"type": "json_object"},
+            "temperature": 0.7,
+            "max_tokens": 500
+        }
+    
+    def _multi_enhancement_request(
+        self,
+        jobs: List[Tuple[str, Tuple[str, List[Dict], List[Dict]]]]
+    ) -> Dict:
+        """Build one chat completion that enhances several CVs, each labelled by its custom id"""
+        cv_sections = "\n\n".join(
+            f"CV {custom_id}:\n{self._cv_context(cv_text, skills, base_recommendations)}"
+            for custom_id, (cv_text, skills, base_recommendations) in jobs
+        )
+        
+        prompt = f"""Based on the following information for {len(jobs)} CVs, provide career insights and recommendations for each CV separately.
+
+{cv_sections}
+
+For each CV, please provide:
+{ENHANCEMENT_POINTS}
+
+Format your response as a JSON object with key "results": a list with one object per CV, each with keys: id (the CV label), {ENHANCEMENT_KEYS}"""
+
+        return {
+            "model": "gpt-3.5-turbo",
+            "messages": [
+                {"role": "system", "content": ENHANCEMENT_SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            "response_format": {"type": "json_object"},
+            "temperature": 0.7,
+            "max_tokens": 500 * len(jobs)
+        }
+    
+    @staticmethod
+    def _estimated_tokens(request: Dict) -> int:
+        """Rough token count of a chat request: ~4 characters per prompt token plus the completion budget"""
+        prompt_chars = sum(len(message["content"]) for message in request["messages"])
+        return prompt_chars // 4 + request.get("max_tokens", 0)
+    
+    async def _complete(self, request: Dict) -> str:
+        """Get the completion text for a chat request, reusing a cached answer to the same request"""
+        key = llm_response_key(request)
+        content = get_llm_response(key)
+        if content is not None:
+            self.cache_stats["hits"] += 1
+            return content
+        
+        self.cache_stats["misses"] += 1
+        async with self._request_slots:
+            await self._rate_limiter.acquire(self._estimated_tokens(request))
+            response = await self.async_client.chat.completions.create(**request)
+        
+        content = response.choices[0].message.content
+        set_llm_response(key, content)
+        return content
+    
+    @staticmethod
+    def _parse_insight(ai_insight: str) -> Dict:
+        """Parse an AI insight as JSON, falling back to the raw text"""
+        # JSON mode guarantees valid JSON unless the answer was cut off at max_tokens
+        try:
+            return json_loads(ai_insight)
+        except json.JSONDecodeError:
+            return {"raw_insight": ai_insight}
+    
+    async def enhance_recommendations(
         self,
         cv_text: str,
         skills: List[Dict],
@@ -37,52 +243,16 @@ class AIEnhancer:
         Returns:
             Enhanced recommendations with AI insights
         """
-        if not self.enabled or not self.client:
-            # Return base recommendations if AI is not enabled
+        if not self.enabled or not self.async_client or not base_recommendations:
+            # Return base recommendations if AI is not enabled or there is nothing to enhance
             return base_recommendations
         
         try:
-            # Prepare context for AI
-            skill_list = ", ".join([s['name'] for s in skills[:20]])
-            pathway_list = "\n".join([
-                f"- {r['pathway']} (Score: {r['match_score']})"
-                for r in base_recommendations[:5]
-            ])
-            
-            prompt = f"""Based on the following CV information, provide career insights and recommendations.
-
-Skills identified: {skill_list}
-
-Top career pathways matched:
-{pathway_list}
-
-CV Summary: {cv_text[:1000]}...
-
-Please provide:
-1. A brief analysis of the candidate's career profile
-2. Which of the suggested pathways seems most suitable and why
-3. Any additional career paths that might be worth considering
-4. Key skills they should focus on developing next
-
-Format your response as JSON with keys: profile_analysis, best_pathway, additional_pathways, development_focus"""
-
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are an expert career counselor helping people find the right career path based on their skills and experience."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=500
+            ai_insight = await self._complete(
+                self._enhancement_request(cv_text, skills, base_recommendations)
             )
             
-            ai_insight = response.choices[0].message.content
-            
-            # Try to parse as JSON, fallback to text
-            try:
-                ai_data = json.loads(ai_insight)
-            except json.JSONDecodeError:
-                ai_data = {"raw_insight": ai_insight}
+            ai_data = self._parse_insight(ai_insight)
             
             # Enhance the top recommendation with AI insights
             if base_recommendations:
@@ -96,19 +266,131 @@ Format your response as JSON with keys: profile_analysis, best_pathway, addition
             # Return base recommendations on error
             return base_recommendations
     
-    def generate_learning_path(
+    async def submit_enhancement_batch(
         self,
-        current_skills: List[str],
-        target_pathway: str,
-        missing_skills: List[str]
-    ) -> Optional[Dict]:
-        """Generate a personalized learning path"""
+        jobs: Dict[str, Tuple[str, List[Dict], List[Dict]]],
+        metadata: Optional[Dict[str, str]] = None
+    ) -> Optional[str]:
+        """
+        Submit recommendation enhancements as one OpenAI Batch API job
+        
+        Batch jobs cost half as much as interactive calls and run against a
+        separate rate limit, at the price of completing within 24 hours.
         
-        if not self.enabled or not self.client:
+        Args:
+            jobs: (cv_text, skills, base_recommendations) keyed by a custom id
+                (which must not contain "+")
+            metadata: Metadata stored on the batch (e.g. the owner)
+            
+        Returns:
+            The batch id, or None if AI is disabled or submission failed
+        """
+        if not self.enabled or not self.async_client or not jobs:
             return None
         
         try:
-            prompt = f"""Create a learning roadmap for someone who wants to become a {target_pathway}.
+            # CVs are grouped CVS_PER_BATCH_REQUEST to a request; a group's
+            # custom id joins its members' ids with "+"
+            items = list(jobs.items())
+            lines = []
+            for start in range(0, len(items), CVS_PER_BATCH_REQUEST):
+                group = items[start:start + CVS_PER_BATCH_REQUEST]
+                if len(group) == 1:
+                    custom_id, (cv_text, skills, base_recommendations) = group[0]
+                    body = self._enhancement_request(cv_text, skills, base_recommendations)
+                else:
+                    custom_id = "+".join(job_id for job_id, _ in group)
+                    body = self._multi_enhancement_request(group)
+                
+                lines.append(json_dumps({
+                    "custom_id": custom_id,
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": body
+                }))
+            batch_input = await self.async_client.files.create(
+                file=("enhancements.jsonl", b"\n".join(lines)),
+                purpose="batch"
+            )
+            batch = await self.async_client.batches.create(
+                input_file_id=batch_input.id,
+                endpoint="/v1/chat/completions",
+                completion_window="24h",
+                metadata=metadata
+            )
+            return batch.id
+            
+        except Exception as e:
+            print(f"AI enhancement batch submission failed: {e}")
+            return None
+    
+    async def get_enhancement_batch(self, batch_id: str):
+        """Get an enhancement batch job, or None if it cannot be retrieved"""
+        if not self.enabled or not self.async_client:
+            return None
+        
+        try:
+            return await self.async_client.batches.retrieve(batch_id)
+        except Exception as e:
+            print(f"AI enhancement batch lookup failed: {e}")
+            return None
+    
+    async def read_enhancement_batch(self, batch) -> Dict[str, Dict]:
+        """Read the AI insights of a completed batch, keyed by custom id"""
+        if not batch.output_file_id:
+            return {}
+        
+        try:
+            output = await self.async_client.files.content(batch.output_file_id)
+        except Exception as e:
+            print(f"AI enhancement batch download failed: {e}")
+            return {}
+        
+        insights = {}
+        for line in output.text.splitlines():
+            if not line.strip():
+                continue
+            # A malformed line only costs the insights of the CVs it answers
+            try:
+                result = json_loads(line)
+                response = result.get("response") or {}
+                if response.get("status_code") != 200:
+                    continue
+                ai_insight = response["body"]["choices"][0]["message"]["content"]
+                if ai_insight is None:
+                    # No answer (e.g. a refusal)
+                    continue
+                custom_ids = result["custom_id"].split("+")
+                if len(custom_ids) == 1:
+                    insights[custom_ids[0]] = self._parse_insight(ai_insight)
+                    continue
+            except Exception as e:
+                print(f"Could not read AI enhancement batch result: {e}")
+                continue
+            
+            # A grouped request answers with one labelled result per CV; CVs
+            # missing from an unreadable answer are left without insights
+            try:
+                group_results = json_loads(ai_insight)["results"]
+                if not isinstance(group_results, list):
+                    raise TypeError("results is not a list")
+            except (json.JSONDecodeError, KeyError, TypeError):
+                print(f"Could not read grouped AI insights for {result['custom_id']}")
+                continue
+            for item in group_results:
+                if isinstance(item, dict) and item.get("id") in custom_ids:
+                    insights[item.pop("id")] = item
+        
+        return insights
+    
+    def _learning_path_request(
+        self,
+        current_skills: List[str],
+        target_pathway: str,
+        missing_skills: List[str]
+    ) -> Dict:
+        """Build the chat completion parameters for a learning path"""
+        prompt = f"""Create a learning roadmap for someone who wants to become a {target_pathway}.
 
 Current skills: {', '.join(current_skills[:15])}
 Skills needed: {', '.join(missing_skills[:10])}
@@ -121,20 +403,35 @@ Provide a structured 6-month learning plan with:
 
 Format as JSON with structure: {{months: [{{month: 1, focus: "...", resources: [], projects: [], hours_per_week: N}}]}}"""
 
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are an expert tech educator who creates practical learning paths."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=700
+        return {
+            "model": "gpt-3.5-turbo",
+            "messages": [
+                {"role": "system", "content": "You are an expert tech educator who creates practical learning paths."},
+                {"role": "user", "content": prompt}
+            ],
+            "response_format": {"type": "json_object"},
+            "temperature": 0.7,
+            "max_tokens": 700
+        }
+    
+    async def generate_learning_path(
+        self,
+        current_skills: List[str],
+        target_pathway: str,
+        missing_skills: List[str]
+    ) -> Optional[Dict]:
+        """Generate a personalized learning path"""
+        
+        if not self.enabled or not self.async_client:
+            return None
+        
+        try:
+            learning_path = await self._complete(
+                self._learning_path_request(current_skills, target_pathway, missing_skills)
             )
             
-            learning_path = response.choices[0].message.content
-            
             try:
-                return json.loads(learning_path)
+                return json_loads(learning_path)
             except json.JSONDecodeError:
                 return {"raw_plan": learning_path}
                 
@@ -142,7 +439,42 @@ Format as JSON with structure: {{months: [{{month: 1, focus: "...", resources: [
             print(f"Learning path generation failed: {e}")
             return None
     
-    def analyze_career_gap(
+    async def stream_learning_path(
+        self,
+        current_skills: List[str],
+        target_pathway: str,
+        missing_skills: List[str]
+    ) -> AsyncIterator[str]:
+        """
+        Generate a personalized learning path, yielding its text as it is produced
+        
+        Errors are raised to the caller, which has already started its response.
+        """
+        if not self.enabled or not self.async_client:
+            raise RuntimeError("AI enhancement is not configured")
+        
+        request = self._learning_path_request(current_skills, target_pathway, missing_skills)
+        key = llm_response_key(request)
+        cached = get_llm_response(key)
+        if cached is not None:
+            self.cache_stats["hits"] += 1
+            yield cached
+            return
+        
+        self.cache_stats["misses"] += 1
+        parts = []
+        async with self._request_slots:
+            await self._rate_limiter.acquire(self._estimated_tokens(request))
+            stream = await self.async_client.chat.completions.create(**request, stream=True)
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    parts.append(chunk.choices[0].delta.content)
+                    yield parts[-1]
+        
+        # Only a completed stream is cached, so both endpoints can reuse it
+        set_llm_response(key, "".join(parts))
+    
+    async def analyze_career_gap(
         self,
         current_role: str,
         target_pathway: str,
@@ -150,7 +482,7 @@ Format as JSON with structure: {{months: [{{month: 1, focus: "...", resources: [
     ) -> Optional[str]:
         """Analyze the gap between current position and target career"""
         
-        if not self.enabled or not self.client:
+        if not self.enabled or not self.async_client:
             return None
         
         try:
@@ -169,17 +501,15 @@ Provide:
 
 Keep response concise (200 words max)."""
 
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
+            return await self._complete({
+                "model": "gpt-3.5-turbo",
+                "messages": [
                     {"role": "system", "content": "You are a career transition advisor."},
                     {"role": "user", "content": prompt}
                 ],
-                temperature=0.7,
-                max_tokens=300
-            )
-            
-            return response.choices[0].message.content
+                "temperature": 0.7,
+                "max_tokens": 300
+            })
             
         except Exception as e:
             print(f"Career gap analysis failed: {e}")
@@ -199,3 +529,9 @@ Keep response concise (200 words max)."""
             summary_parts.append(f"{category.title()}: {', '.join(skill_list[:5])}")
         
         return "\n".join(summary_parts)
+
+
+@lru_cache(maxsize=1)
+def get_ai_enhancer() -> AIEnhancer:
+    """Shared AIEnhancer, so the OpenAI client and its connection pool are reused"""
+    return AIEnhancer()
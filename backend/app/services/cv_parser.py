@@ -1,20 +1,63 @@
 import re
 from typing import Dict, Any, Optional, List
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+import multiprocessing
+import os
+import threading
 import PyPDF2
 import pdfplumber
+from cachetools import LRUCache
 from docx import Document
 from pathlib import Path
 
+# PDFs with at least this many pages have their pages extracted in worker
+# processes; shorter CVs don't repay the cost of reopening the file per worker
+PARALLEL_PDF_MIN_PAGES = 8
+
+
+def _extract_page_texts(file_path: str, start: int, stop: int) -> List[str]:
+    """Extract the text of pages start..stop-1 (runs in a worker process)"""
+    page_texts = []
+    with pdfplumber.open(file_path) as pdf:
+        for page in pdf.pages[start:stop]:
+            page_texts.append(page.extract_text() or "")
+            page.close()
+    return page_texts
+
 
 class CVParser:
     """Service for parsing CV files (PDF and DOCX)"""
     
     def __init__(self):
+        # Worker processes for long PDFs, started on first use
+        self._pool = None
+        
         self.email_pattern = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
         self.phone_pattern = re.compile(r'[\+\(]?[1-9][0-9 .\-\(\)]{8,}[0-9]')
         self.years_pattern = re.compile(r'(\d+)\+?\s*years?', re.IGNORECASE)
         self.date_pattern = re.compile(r'(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s*\d{4}|(\d{1,2}/\d{4})|(\d{4})', re.IGNORECASE)
+        self.current_pattern = re.compile(r'\bpresent\b|\bcurrent\b', re.IGNORECASE)
+        self.separator_pattern = re.compile(r'\s+[-–—|@]\s+|\s+at\s+')
+        self.year_pattern = re.compile(r'(\d{4})')
+        
+        # Section header keywords, checked in this order when a line has
+        # keywords from several sections
+        self.section_keywords = {
+            'experience': ['work experience', 'professional experience', 'employment'],
+            'education': ['education', 'academic'],
+            'skills': ['skills', 'technical skills', 'competencies'],
+            'certifications': ['certifications', 'certificates', 'licenses'],
+        }
+        
+        # Headers that open and close an experience section without a standard heading
+        self.experience_start_pattern = self._keyword_pattern(
+            ['work experience', 'professional experience', 'employment history', 'career history']
+        )
+        self.experience_end_pattern = self._keyword_pattern(
+            ['education', 'skills', 'certifications', 'projects']
+        )
         
         # Common job title keywords
         self.job_title_keywords = [
@@ -29,6 +72,70 @@ class CVParser:
         self.startup_keywords = ['startup', 'start-up', 'seed', 'series a', 'series b', 'venture']
         self.tech_keywords = ['software', 'technology', 'tech', 'saas', 'cloud', 'data', 
                              'ai', 'ml', 'mobile', 'web', 'internet', 'digital']
+        self.job_title_pattern = self._keyword_pattern(self.job_title_keywords)
+        
+        # Classification keywords, one compiled pattern per label; each list
+        # of (label, pattern) is checked in order and the first hit wins
+        self.seniority_patterns = [
+            (level, self._keyword_pattern(keywords))
+            for level, keywords in [
+                ('director', ['cto', 'cio', 'vp', 'vice president', 'director', 'head of', 'chief']),
+                ('principal', ['principal', 'staff', 'distinguished', 'fellow']),
+                ('senior', ['lead', 'senior', 'sr.', 'sr ']),
+                ('junior', ['junior', 'jr.', 'jr ', 'associate', 'entry']),
+                ('intern', ['intern', 'trainee', 'apprentice']),
+            ]
+        ]
+        # Job titles repeat across entries and CVs, so their seniority
+        # levels are kept, keyed by the lowercased title
+        self._seniority_cache = LRUCache(maxsize=4096)
+        self._seniority_cache_lock = threading.Lock()
+        self.company_size_patterns = [
+            (size, self._keyword_pattern(keywords))
+            for size, keywords in [
+                # Known large tech companies
+                ('enterprise', ['google', 'microsoft', 'amazon', 'apple', 'meta',
+                                'facebook', 'netflix', 'ibm', 'oracle', 'salesforce']),
+                ('large', self.enterprise_keywords),
+                ('startup', self.startup_keywords),
+            ]
+        ]
+        self.industry_patterns = [
+            (industry, self._keyword_pattern(keywords))
+            for industry, keywords in [
+                ('tech', self.tech_keywords),
+                ('finance', ['bank', 'financial', 'finance', 'investment', 'trading', 'capital']),
+                ('healthcare', ['health', 'medical', 'hospital', 'pharma', 'clinical']),
+                ('consulting', ['consulting', 'consultant', 'advisory', 'services']),
+            ]
+        ]
+    
+    @staticmethod
+    def _keyword_pattern(keywords: List[str]) -> re.Pattern:
+        """Compile keywords into one pattern matching any of them as a substring"""
+        return re.compile('|'.join(re.escape(keyword) for keyword in keywords))
+    
+    def _header_line_numbers(self, text_lower: str) -> List[int]:
+        """Get the numbers of the lines that contain a section keyword"""
+        # Find every keyword occurrence with str.find, which scans the whole
+        # text far faster than testing each line (or a regex alternation)
+        positions = set()
+        for keywords in self.section_keywords.values():
+            for keyword in keywords:
+                position = text_lower.find(keyword)
+                while position != -1:
+                    positions.add(position)
+                    position = text_lower.find(keyword, position + 1)
+        
+        line_numbers = []
+        line_number = 0
+        previous = 0
+        for position in sorted(positions):
+            line_number += text_lower.count('\n', previous, position)
+            previous = position
+            if not line_numbers or line_numbers[-1] != line_number:
+                line_numbers.append(line_number)
+        return line_numbers
         
     def parse_file(self, file_path: str) -> Dict[str, Any]:
         """Parse a CV file and extract information"""
@@ -38,9 +145,10 @@ class CVParser:
             raise FileNotFoundError(f"File not found: {file_path}")
         
         # Extract text based on file type
-        if file_path.suffix.lower() == '.pdf':
+        suffix = file_path.suffix.lower()
+        if suffix == '.pdf':
             raw_text = self._parse_pdf(file_path)
-        elif file_path.suffix.lower() == '.docx':
+        elif suffix == '.docx':
             raw_text = self._parse_docx(file_path)
         else:
             raise ValueError(f"Unsupported file type: {file_path.suffix}")
@@ -51,33 +159,71 @@ class CVParser:
         
         return parsed_data
     
+    def _page_pool(self) -> ProcessPoolExecutor:
+        """Get the worker pool used for long PDFs"""
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=os.cpu_count(),
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+    
+    def close(self):
+        """Stop the PDF worker processes"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+    
     def _parse_pdf(self, file_path: Path) -> str:
         """Extract text from PDF file"""
-        text = ""
+        # Page texts are collected and joined once, rather than re-copying
+        # the growing document for every page
+        page_texts = []
+        
+        # Uploads are size-capped, so the file is read from disk once and
+        # both parsers work on the same bytes
+        pdf_bytes = file_path.read_bytes()
         
         try:
             # Try pdfplumber first (better for complex layouts)
-            with pdfplumber.open(file_path) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
+            with pdfplumber.open(BytesIO(pdf_bytes)) as pdf:
+                page_count = len(pdf.pages)
+                workers = min(os.cpu_count() or 1, page_count)
+                parallel = page_count >= PARALLEL_PDF_MIN_PAGES and workers > 1
+                if not parallel:
+                    for page in pdf.pages:
+                        page_text = page.extract_text()
+                        if page_text:
+                            page_texts.append(page_text)
+                        # Free the page's parsed layout objects before the next page
+                        page.close()
+            
+            if parallel:
+                # Each worker reopens the file and extracts one contiguous run
+                # of pages, so the file is parsed once per worker, not per page
+                bounds = [page_count * i // workers for i in range(workers + 1)]
+                chunks = self._page_pool().map(
+                    _extract_page_texts,
+                    [os.fspath(file_path)] * workers,
+                    bounds[:-1],
+                    bounds[1:]
+                )
+                page_texts = [page_text for chunk in chunks for page_text in chunk if page_text]
         except Exception as e:
             print(f"pdfplumber failed: {e}, trying PyPDF2")
             
             # Fallback to PyPDF2
             try:
-                with open(file_path, 'rb') as file:
-                    pdf_reader = PyPDF2.PdfReader(file)
-                    for page in pdf_reader.pages:
-                        page_text = page.extract_text()
-                        if page_text:
-                            text += page_text + "\n"
+                pdf_reader = PyPDF2.PdfReader(BytesIO(pdf_bytes))
+                for page in pdf_reader.pages:
+                    page_text = page.extract_text()
+                    if page_text:
+                        page_texts.append(page_text)
             except Exception as e:
                 print(f"PyPDF2 also failed: {e}")
                 raise ValueError(f"Could not extract text from PDF: {e}")
         
-        return text.strip()
+        return "\n".join(page_texts).strip()
     
     def _parse_docx(self, file_path: Path) -> str:
         """Extract text from DOCX file"""
@@ -137,42 +283,23 @@ class CVParser:
             'certifications': ''
         }
         
-        text_lower = text.lower()
         lines = text.split('\n')
         
-        current_section = None
-        section_content = []
-        
-        for line in lines:
-            line_lower = line.lower().strip()
-            
-            # Detect section headers
-            if any(keyword in line_lower for keyword in ['work experience', 'professional experience', 'employment']):
-                if current_section and section_content:
-                    sections[current_section] = '\n'.join(section_content)
-                current_section = 'experience'
-                section_content = []
-            elif any(keyword in line_lower for keyword in ['education', 'academic']):
-                if current_section and section_content:
-                    sections[current_section] = '\n'.join(section_content)
-                current_section = 'education'
-                section_content = []
-            elif any(keyword in line_lower for keyword in ['skills', 'technical skills', 'competencies']):
-                if current_section and section_content:
-                    sections[current_section] = '\n'.join(section_content)
-                current_section = 'skills'
-                section_content = []
-            elif any(keyword in line_lower for keyword in ['certifications', 'certificates', 'licenses']):
-                if current_section and section_content:
-                    sections[current_section] = '\n'.join(section_content)
-                current_section = 'certifications'
-                section_content = []
-            elif current_section and line.strip():
-                section_content.append(line)
-        
-        # Save the last section
-        if current_section and section_content:
-            sections[current_section] = '\n'.join(section_content)
+        # Each header line starts a section that runs until the next header;
+        # only the header lines themselves need lowercasing again
+        header_lines = self._header_line_numbers(text.lower())
+        for start, end in zip(header_lines, header_lines[1:] + [len(lines)]):
+            header = lines[start].lower()
+            section = next(
+                section for section, keywords in self.section_keywords.items()
+                if any(keyword in header for keyword in keywords)
+            )
+            # isspace() tests for blank lines without building a stripped copy of each one
+            section_content = [
+                line for line in lines[start + 1:end] if line and not line.isspace()
+            ]
+            if section_content:
+                sections[section] = '\n'.join(section_content)
         
         return sections
     
@@ -189,11 +316,11 @@ class CVParser:
             experience_lines = []
             
             for line in lines:
-                line_lower = line.lower().strip()
-                if any(keyword in line_lower for keyword in ['work experience', 'professional experience', 'employment history', 'career history']):
+                line_lower = line.lower()
+                if self.experience_start_pattern.search(line_lower):
                     in_experience_section = True
                     continue
-                elif in_experience_section and any(keyword in line_lower for keyword in ['education', 'skills', 'certifications', 'projects']):
+                elif in_experience_section and self.experience_end_pattern.search(line_lower):
                     break
                 elif in_experience_section:
                     experience_lines.append(line)
@@ -220,12 +347,11 @@ class CVParser:
             if not line:
                 continue
             
-            # Check if line looks like a job title (contains job keywords)
-            line_lower = line.lower()
-            is_job_title = any(keyword in line_lower for keyword in self.job_title_keywords)
-            has_dates = self.date_pattern.search(line)
-            
-            if is_job_title or (has_dates and len(line.split()) >= 2):
+            # A new entry starts at a line that looks like a job title (contains
+            # job keywords) or has dates; the date scan only runs when needed
+            if self.job_title_pattern.search(line.lower()) or (
+                len(line.split()) >= 2 and self.date_pattern.search(line)
+            ):
                 # Save previous experience
                 if current_experience:
                     current_experience['description'] = '\n'.join(current_description).strip()
@@ -284,24 +410,25 @@ class CVParser:
             'technologies_used': ''
         }
         
-        # Extract dates
-        dates = self.date_pattern.findall(line)
-        if dates:
-            # Flatten the tuple results
-            date_strings = []
-            for date_tuple in dates:
-                for d in date_tuple:
-                    if d:
-                        date_strings.append(d)
-            
-            if len(date_strings) >= 2:
-                experience['start_date'] = date_strings[0]
-                experience['end_date'] = date_strings[1]
-            elif len(date_strings) == 1:
-                experience['start_date'] = date_strings[0]
+        # Extract dates, and cut them out of the line in the same pass to
+        # leave the title and company
+        date_strings = []
+        undated_parts = []
+        previous_end = 0
+        for match in self.date_pattern.finditer(line):
+            date_strings.extend(d for d in match.groups() if d)
+            undated_parts.append(line[previous_end:match.start()])
+            previous_end = match.end()
+        undated_parts.append(line[previous_end:])
+        
+        if len(date_strings) >= 2:
+            experience['start_date'] = date_strings[0]
+            experience['end_date'] = date_strings[1]
+        elif len(date_strings) == 1:
+            experience['start_date'] = date_strings[0]
         
         # Check for "Present" or "Current"
-        if re.search(r'\bpresent\b|\bcurrent\b', line, re.IGNORECASE):
+        if self.current_pattern.search(line):
             experience['is_current'] = True
             experience['end_date'] = 'Present'
         
@@ -311,13 +438,12 @@ class CVParser:
             experience['end_date']
         )
         
-        # Remove dates from line to extract title and company
-        line_without_dates = re.sub(self.date_pattern, '', line)
-        line_without_dates = re.sub(r'\bpresent\b|\bcurrent\b', '', line_without_dates, flags=re.IGNORECASE)
+        # Remove "Present"/"Current" too to extract title and company
+        line_without_dates = self.current_pattern.sub('', ''.join(undated_parts))
         line_without_dates = line_without_dates.strip(' -–—|')
         
         # Split by common separators
-        parts = re.split(r'\s+[-–—|@]\s+|\s+at\s+', line_without_dates, maxsplit=1)
+        parts = self.separator_pattern.split(line_without_dates, maxsplit=1)
         
         if len(parts) >= 2:
             experience['job_title'] = parts[0].strip()
@@ -334,14 +460,14 @@ class CVParser:
         
         try:
             # Try to parse years
-            start_year_match = re.search(r'(\d{4})', start_date)
+            start_year_match = self.year_pattern.search(start_date)
             if not start_year_match:
                 return None
             
             start_year = int(start_year_match.group(1))
             
             if end_date and end_date.lower() != 'present':
-                end_year_match = re.search(r'(\d{4})', end_date)
+                end_year_match = self.year_pattern.search(end_date)
                 if end_year_match:
                     end_year = int(end_year_match.group(1))
                 else:
@@ -357,83 +483,41 @@ class CVParser:
         except Exception:
             return None
     
+    @staticmethod
+    def _first_match(patterns: List, text: str, default: str) -> str:
+        """Get the label of the first (label, pattern) pair whose pattern occurs in text"""
+        for label, pattern in patterns:
+            if pattern.search(text):
+                return label
+        return default
+    
     def _detect_seniority_level(self, job_title: str) -> str:
         """Detect seniority level from job title"""
         if not job_title:
             return 'mid'
         
-        title_lower = job_title.lower()
-        
-        # Executive/Director level
-        if any(keyword in title_lower for keyword in ['cto', 'cio', 'vp', 'vice president', 'director', 'head of', 'chief']):
-            return 'director'
-        
-        # Principal/Staff level
-        if any(keyword in title_lower for keyword in ['principal', 'staff', 'distinguished', 'fellow']):
-            return 'principal'
-        
-        # Lead/Senior level
-        if any(keyword in title_lower for keyword in ['lead', 'senior', 'sr.', 'sr ']):
-            return 'senior'
-        
-        # Junior/Entry level
-        if any(keyword in title_lower for keyword in ['junior', 'jr.', 'jr ', 'associate', 'entry']):
-            return 'junior'
-        
-        # Intern level
-        if any(keyword in title_lower for keyword in ['intern', 'trainee', 'apprentice']):
-            return 'intern'
-        
-        # Default to mid level
-        return 'mid'
+        title = job_title.lower()
+        with self._seniority_cache_lock:
+            level = self._seniority_cache.get(title)
+        if level is None:
+            # Default to mid level
+            level = self._first_match(self.seniority_patterns, title, 'mid')
+            with self._seniority_cache_lock:
+                self._seniority_cache[title] = level
+        return level
     
     def _detect_company_size(self, company_name: str, description: str) -> str:
         """Detect company size from name and description"""
         if not company_name:
             return 'unknown'
         
-        company_lower = company_name.lower()
-        desc_lower = (description or '').lower()
-        combined = f"{company_lower} {desc_lower}"
-        
-        # Known large tech companies
-        if any(keyword in combined for keyword in ['google', 'microsoft', 'amazon', 'apple', 'meta', 
-                                                    'facebook', 'netflix', 'ibm', 'oracle', 'salesforce']):
-            return 'enterprise'
-        
-        # Enterprise indicators
-        if any(keyword in combined for keyword in self.enterprise_keywords):
-            return 'large'
-        
-        # Startup indicators
-        if any(keyword in combined for keyword in self.startup_keywords):
-            return 'startup'
-        
-        return 'medium'
+        combined = f"{company_name} {description or ''}".lower()
+        return self._first_match(self.company_size_patterns, combined, 'medium')
     
     def _detect_company_industry(self, company_name: str, description: str) -> str:
         """Detect company industry from name and description"""
         if not company_name:
             return 'unknown'
         
-        company_lower = company_name.lower()
-        desc_lower = (description or '').lower()
-        combined = f"{company_lower} {desc_lower}"
-        
-        # Tech industry
-        if any(keyword in combined for keyword in self.tech_keywords):
-            return 'tech'
-        
-        # Finance
-        if any(keyword in combined for keyword in ['bank', 'financial', 'finance', 'investment', 'trading', 'capital']):
-            return 'finance'
-        
-        # Healthcare
-        if any(keyword in combined for keyword in ['health', 'medical', 'hospital', 'pharma', 'clinical']):
-            return 'healthcare'
-        
-        # Consulting
-        if any(keyword in combined for keyword in ['consulting', 'consultant', 'advisory', 'services']):
-            return 'consulting'
-        
-        return 'other'
+        combined = f"{company_name} {description or ''}".lower()
+        return self._first_match(self.industry_patterns, combined, 'other')
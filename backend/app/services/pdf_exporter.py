@@ -51,7 +51,7 @@ class PDFExporter:
         ))
         
         self.styles.add(ParagraphStyle(
-            name='BodyText',
+            name='ReportBody',
             parent=self.styles['Normal'],
             fontSize=10,
             spaceAfter=6
@@ -139,23 +139,23 @@ class PDFExporter:
         elements.append(Spacer(1, 0.5*inch))
         elements.append(Paragraph(
             f"<b>CV:</b> {cv_data.get('filename', 'N/A')}",
-            self.styles['BodyText']
+            self.styles['ReportBody']
         ))
         elements.append(Paragraph(
             f"<b>Generated:</b> {datetime.now().strftime('%B %d, %Y at %I:%M %p')}",
-            self.styles['BodyText']
+            self.styles['ReportBody']
         ))
         
         if cv_data.get('years_experience'):
             elements.append(Paragraph(
                 f"<b>Years of Experience:</b> {cv_data.get('years_experience')} years",
-                self.styles['BodyText']
+                self.styles['ReportBody']
             ))
         
         if cv_data.get('education_level'):
             elements.append(Paragraph(
                 f"<b>Education Level:</b> {cv_data.get('education_level')}",
-                self.styles['BodyText']
+                self.styles['ReportBody']
             ))
         
         elements.append(PageBreak())
@@ -172,7 +172,7 @@ class PDFExporter:
         if not recommendations:
             elements.append(Paragraph(
                 "No recommendations available.",
-                self.styles['BodyText']
+                self.styles['ReportBody']
             ))
             return elements
         
@@ -193,7 +193,7 @@ class PDFExporter:
         with a {int(top_match.get('match_score', 0) * 100)}% compatibility score.
         """
         
-        elements.append(Paragraph(summary_text, self.styles['BodyText']))
+        elements.append(Paragraph(summary_text, self.styles['ReportBody']))
         elements.append(Spacer(1, 0.3*inch))
         
         return elements
@@ -219,14 +219,14 @@ class PDFExporter:
             if rec.get('description'):
                 elements.append(Paragraph(
                     rec.get('description', ''),
-                    self.styles['BodyText']
+                    self.styles['ReportBody']
                 ))
             
             # Reasoning
             if rec.get('reasoning'):
                 elements.append(Paragraph(
                     f"<i>{rec.get('reasoning', '')}</i>",
-                    self.styles['BodyText']
+                    self.styles['ReportBody']
                 ))
             
             # Recommended skills
@@ -236,7 +236,7 @@ class PDFExporter:
                     skills_text = ", ".join(skills[:8])
                     elements.append(Paragraph(
                         f"<b>Skills to learn:</b> {skills_text}",
-                        self.styles['BodyText']
+                        self.styles['ReportBody']
                     ))
             
             elements.append(Spacer(1, 0.15*inch))
@@ -318,7 +318,7 @@ class PDFExporter:
         
         elements.append(Paragraph(
             "<b>Priority Skills to Learn:</b> (Based on top career matches)",
-            self.styles['BodyText']
+            self.styles['ReportBody']
         ))
         elements.append(Spacer(1, 0.1*inch))
         
@@ -361,7 +361,7 @@ class PDFExporter:
         ]
         
         for action in actions:
-            elements.append(Paragraph(action, self.styles['BodyText']))
+            elements.append(Paragraph(action, self.styles['ReportBody']))
         
         return elements
     
@@ -418,3 +418,26 @@ class PDFExporter:
         buffer.seek(0)
         return buffer
 
+
+# Per-process exporter used by render_recommendations_report
+_exporter = None
+
+
+def render_recommendations_report(
+    recommendations_data: Dict[str, Any],
+    cv_data: Dict[str, Any]
+) -> bytes:
+    """
+    Render a recommendations report to PDF bytes.
+    
+    Module-level so it can be submitted to a process pool; each worker
+    process builds its own PDFExporter on first use.
+    """
+    global _exporter
+    if _exporter is None:
+        _exporter = PDFExporter()
+    
+    return _exporter.generate_recommendations_report(
+        recommendations_data=recommendations_data,
+        cv_data=cv_data
+    ).getvalue()
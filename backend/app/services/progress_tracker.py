@@ -3,12 +3,125 @@ Progress Tracker Service
 Tracks career development progress over time.
 """
 
-import json
-from typing import List, Dict, Any, Optional
+import threading
+from typing import Callable, List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
+import numpy as np
+from cachetools import LRUCache
+from sqlalchemy import bindparam, func, literal, select
 from sqlalchemy.orm import Session
+from app.core.serialization import json_dumps, json_loads
 from app.models.models import CV, ProgressEntry, Skill, Recommendation, LearnedSkill
 
+# Timelines and analytics (as JSON) keyed by the CV and the version of the
+# rows they are built from, so new data changes the key and stale results
+# are never served
+_RESULT_CACHE = LRUCache(maxsize=256)
+_RESULT_CACHE_LOCK = threading.Lock()
+
+# The queries below run on every snapshot, timeline and analytics request.
+# They are built once with a cv_id parameter: SQLAlchemy reuses their
+# compiled SQL either way, but constructing the statements on each call
+# cost more than executing them
+_CV_ID = bindparam("cv_id")
+
+_CV_IDS = bindparam("cv_ids", expanding=True)
+
+# A CV's fields, a summary of its recommendations and the previous
+# snapshot's skills, one row per CV. Recommendations are replaced as a set
+# whenever they are generated, so the aggregates cover exactly the latest
+# ones (from the cv_id, match_score index)
+_SNAPSHOT_INPUTS = select(
+    CV.id,
+    CV.years_experience,
+    CV.education_level,
+    select(func.max(Recommendation.match_score))
+    .where(Recommendation.cv_id == CV.id)
+    .scalar_subquery()
+    .label("top_match_score"),
+    select(func.count(Recommendation.id))
+    .where(Recommendation.cv_id == CV.id)
+    .scalar_subquery()
+    .label("recommendations_count"),
+    # NULL only when there is no previous snapshot
+    select(func.coalesce(
+        ProgressEntry.skills_learned, literal([], ProgressEntry.skills_learned.type)
+    ))
+    .where(ProgressEntry.cv_id == CV.id)
+    .order_by(ProgressEntry.date.desc())
+    .limit(1)
+    .scalar_subquery()
+    .label("previous_skills_learned")
+)
+_CV_SNAPSHOT_INPUTS = _SNAPSHOT_INPUTS.where(CV.id == _CV_ID)
+_BATCH_SNAPSHOT_INPUTS = _SNAPSHOT_INPUTS.where(CV.id.in_(_CV_IDS))
+
+_SKILLS = select(Skill.skill_name, Skill.skill_category).where(Skill.cv_id == _CV_ID)
+_BATCH_SKILLS = select(
+    Skill.cv_id, Skill.skill_name, Skill.skill_category
+).where(Skill.cv_id.in_(_CV_IDS))
+
+# Entries and skills are only ever added, so the newest id changes with
+# them; recommendations are replaced as a set with a new created_at
+_DATA_VERSION = select(
+    select(func.max(ProgressEntry.id))
+    .where(ProgressEntry.cv_id == _CV_ID)
+    .scalar_subquery(),
+    select(func.max(Skill.id))
+    .where(Skill.cv_id == _CV_ID)
+    .scalar_subquery(),
+    select(func.max(Recommendation.created_at))
+    .where(Recommendation.cv_id == _CV_ID)
+    .scalar_subquery()
+)
+
+# Timelines only change when entries are added
+_TIMELINE_VERSION = select(
+    func.count(ProgressEntry.id), func.max(ProgressEntry.id)
+).where(ProgressEntry.cv_id == _CV_ID)
+
+_ENTRIES_BY_DATE = (
+    select(ProgressEntry)
+    .where(ProgressEntry.cv_id == _CV_ID)
+    .order_by(ProgressEntry.date.asc())
+)
+
+# Timeline fields only, streamed in batches, so a long history is never
+# held as ORM objects all at once
+_TIMELINE_ROWS = (
+    select(
+        ProgressEntry.id,
+        ProgressEntry.date,
+        ProgressEntry.skills_count,
+        ProgressEntry.top_match_score,
+        ProgressEntry.skills_learned,
+        ProgressEntry.metrics
+    )
+    .where(ProgressEntry.cv_id == _CV_ID)
+    .order_by(ProgressEntry.date.asc())
+    .execution_options(yield_per=100)
+)
+
+_TOP_RECOMMENDATIONS = (
+    select(Recommendation.pathway, Recommendation.match_score)
+    .where(Recommendation.cv_id == _CV_ID)
+    .order_by(Recommendation.match_score.desc())
+    .limit(5)
+)
+
+# In order of first appearance
+_SKILL_CATEGORY_COUNTS = (
+    select(Skill.skill_category, func.count(Skill.id))
+    .where(Skill.cv_id == _CV_ID)
+    .group_by(Skill.skill_category)
+    .order_by(func.min(Skill.id))
+)
+
+# The month ('%b %Y'), day ('%Y-%m-%d') and short day ('%b %d') labels of an
+# entry, formatted by one strftime call: each call costs microseconds
+# whatever the format, so one call and a split beat three calls
+_ENTRY_LABELS_FORMAT = "%b %Y\n%Y-%m-%d\n%b %d"
+
 
 class ProgressTracker:
     """Service for tracking career development progress"""
@@ -26,30 +139,79 @@ class ProgressTracker:
         Returns:
             Dictionary with snapshot data
         """
-        cv = self.db.query(CV).filter(CV.id == cv_id).first()
-        if not cv:
+        cv = self.db.execute(_CV_SNAPSHOT_INPUTS, {"cv_id": cv_id}).first()
+        if cv is None:
             raise ValueError(f"CV with id {cv_id} not found")
         
         # Get current skills
-        skills = self.db.query(Skill).filter(Skill.cv_id == cv_id).all()
+        skills = self.db.execute(_SKILLS, {"cv_id": cv_id}).all()
         
-        # Get latest recommendations
-        recommendations = self.db.query(Recommendation).filter(
-            Recommendation.cv_id == cv_id
-        ).order_by(Recommendation.created_at.desc()).limit(10).all()
+        progress_entry, new_skills, metrics = self._new_progress_entry(
+            cv, skills, datetime.utcnow()
+        )
+        
+        self.db.add(progress_entry)
+        self.db.commit()
+        self.db.refresh(progress_entry)
         
-        # Calculate top match score
-        top_match_score = max([r.match_score for r in recommendations]) if recommendations else 0.0
+        return self._snapshot_result(progress_entry, new_skills, metrics)
+    
+    def capture_snapshot_batch(self, cv_ids: List[int]) -> List[Dict[str, Any]]:
+        """
+        Capture snapshots of several CVs in a single transaction.
         
-        # Identify new skills (compare with previous snapshot)
-        previous_entry = self.db.query(ProgressEntry).filter(
-            ProgressEntry.cv_id == cv_id
-        ).order_by(ProgressEntry.date.desc()).first()
+        Their inputs are loaded with one query per table rather than per CV,
+        and the entries are committed together.
         
+        Args:
+            cv_ids: CV IDs to capture snapshots for
+            
+        Returns:
+            List of snapshot data, in the order of cv_ids
+        """
+        cv_ids = list(dict.fromkeys(cv_ids))
+        if not cv_ids:
+            return []
+        
+        cvs = {
+            cv.id: cv
+            for cv in self.db.execute(_BATCH_SNAPSHOT_INPUTS, {"cv_ids": cv_ids})
+        }
+        missing_ids = [cv_id for cv_id in cv_ids if cv_id not in cvs]
+        if missing_ids:
+            raise ValueError(f"CVs with ids {missing_ids} not found")
+        
+        skills_by_cv = {cv_id: [] for cv_id in cv_ids}
+        for skill in self.db.execute(_BATCH_SKILLS, {"cv_ids": cv_ids}):
+            skills_by_cv[skill.cv_id].append(skill)
+        
+        date = datetime.utcnow()
+        snapshots = [
+            self._new_progress_entry(cvs[cv_id], skills_by_cv[cv_id], date)
+            for cv_id in cv_ids
+        ]
+        
+        self.db.add_all(progress_entry for progress_entry, _, _ in snapshots)
+        # Flushing assigns the ids, so the results need no refresh after the commit
+        self.db.flush()
+        results = [self._snapshot_result(*snapshot) for snapshot in snapshots]
+        self.db.commit()
+        
+        return results
+    
+    def _new_progress_entry(
+        self,
+        cv: Any,
+        skills: List[Any],
+        date: datetime
+    ) -> Tuple[ProgressEntry, List[str], Dict[str, Any]]:
+        """Build a CV's progress entry from its snapshot inputs and current skills"""
+        top_match_score = cv.top_match_score if cv.top_match_score is not None else 0.0
+        
+        # Identify new skills (compare with previous snapshot)
         new_skills = []
-        if previous_entry:
-            previous_skills_data = json.loads(previous_entry.skills_learned or "[]")
-            previous_skills = set(previous_skills_data)
+        if cv.previous_skills_learned is not None:
+            previous_skills = set(cv.previous_skills_learned)
             current_skills = set(skill.skill_name for skill in skills)
             new_skills = list(current_skills - previous_skills)
         
@@ -58,26 +220,30 @@ class ProgressTracker:
             "total_skills": len(skills),
             "skill_categories": self._count_skill_categories(skills),
             "top_match_score": top_match_score,
-            "recommendations_count": len(recommendations),
+            "recommendations_count": cv.recommendations_count,
             "years_experience": cv.years_experience or 0,
-            "education_level": cv.education_level,
-            "skills_list": [skill.skill_name for skill in skills]
+            "education_level": cv.education_level
         }
         
         # Create progress entry
         progress_entry = ProgressEntry(
-            cv_id=cv_id,
-            date=datetime.utcnow(),
+            cv_id=cv.id,
+            date=date,
             skills_count=len(skills),
             top_match_score=top_match_score,
-            skills_learned=json.dumps(new_skills),
-            metrics=json.dumps(metrics)
+            skills_learned=new_skills,
+            metrics=metrics
         )
         
-        self.db.add(progress_entry)
-        self.db.commit()
-        self.db.refresh(progress_entry)
-        
+        return progress_entry, new_skills, metrics
+    
+    def _snapshot_result(
+        self,
+        progress_entry: ProgressEntry,
+        new_skills: List[str],
+        metrics: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Describe a captured progress entry"""
         return {
             "snapshot_id": progress_entry.id,
             "date": progress_entry.date.isoformat(),
@@ -87,32 +253,74 @@ class ProgressTracker:
             "metrics": metrics
         }
     
-    def get_progress_timeline(self, cv_id: int) -> List[Dict[str, Any]]:
+    def _data_version(self, cv_id: int) -> Tuple:
+        """Identify the current progress entries, skills and recommendations of a CV"""
+        return tuple(self.db.execute(_DATA_VERSION, {"cv_id": cv_id}).one())
+    
+    def _cached_result(self, name: str, cv_id: int, build: Callable[[int], Any]) -> Any:
+        """Get a built result from the cache, building it if the CV's data has changed"""
+        key = (name, cv_id, self._data_version(cv_id))
+        with _RESULT_CACHE_LOCK:
+            result_json = _RESULT_CACHE.get(key)
+        
+        if result_json is None:
+            result_json = json_dumps(build(cv_id))
+            with _RESULT_CACHE_LOCK:
+                _RESULT_CACHE[key] = result_json
+        
+        # Callers get a fresh copy, so changes to it never reach the cache
+        return json_loads(result_json)
+    
+    def timeline_version(self, cv_id: int) -> str:
+        """Identify the current state of a CV's progress timeline, e.g. for an ETag"""
+        count, latest_id = self.db.execute(_TIMELINE_VERSION, {"cv_id": cv_id}).one()
+        return f"{count}-{latest_id or 0}"
+    
+    def get_progress_timeline(
+        self,
+        cv_id: int,
+        since: Optional[datetime] = None,
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
         """
         Get historical progress timeline for a CV.
         
+        The full timeline is cached; a page of it is read straight from the
+        (cv_id, date) index.
+        
         Args:
             cv_id: CV ID
+            since: Only include entries dated after this (the last date of the previous page)
+            limit: Maximum number of entries to return
             
         Returns:
             List of progress entries over time
         """
-        entries = self.db.query(ProgressEntry).filter(
-            ProgressEntry.cv_id == cv_id
-        ).order_by(ProgressEntry.date.asc()).all()
-        
+        if since is None and limit is None:
+            return self._cached_result("timeline", cv_id, self._build_progress_timeline)
+        
+        statement = _TIMELINE_ROWS
+        if since is not None:
+            statement = statement.where(ProgressEntry.date > since)
+        if limit is not None:
+            statement = statement.limit(limit)
+        return self._read_timeline(statement, cv_id)
+    
+    def _build_progress_timeline(self, cv_id: int) -> List[Dict[str, Any]]:
+        """Build the progress timeline from the database"""
+        return self._read_timeline(_TIMELINE_ROWS, cv_id)
+    
+    def _read_timeline(self, statement: Any, cv_id: int) -> List[Dict[str, Any]]:
+        """Read timeline entries with a _TIMELINE_ROWS statement"""
         timeline = []
-        for entry in entries:
-            metrics = json.loads(entry.metrics) if entry.metrics else {}
-            skills_learned = json.loads(entry.skills_learned) if entry.skills_learned else []
-            
+        for entry in self.db.execute(statement, {"cv_id": cv_id}):
             timeline.append({
                 "id": entry.id,
                 "date": entry.date.isoformat(),
                 "skills_count": entry.skills_count,
                 "top_match_score": entry.top_match_score,
-                "skills_learned": skills_learned,
-                "metrics": metrics
+                "skills_learned": entry.skills_learned or [],
+                "metrics": entry.metrics or {}
             })
         
         return timeline
@@ -127,9 +335,11 @@ class ProgressTracker:
         Returns:
             Dictionary with analytics data formatted for frontend
         """
-        entries = self.db.query(ProgressEntry).filter(
-            ProgressEntry.cv_id == cv_id
-        ).order_by(ProgressEntry.date.asc()).all()
+        return self._cached_result("analytics", cv_id, self._build_analytics)
+    
+    def _build_analytics(self, cv_id: int) -> Dict[str, Any]:
+        """Calculate the analytics from the database"""
+        entries = self.db.execute(_ENTRIES_BY_DATE, {"cv_id": cv_id}).scalars().all()
         
         if len(entries) < 2:
             # Return empty/default analytics if not enough data
@@ -148,27 +358,75 @@ class ProgressTracker:
                 "recommendations_evolution": []
             }
         
+        # Top recommendations, fetched once for the best match pathway and
+        # the recommendations evolution
+        top_recommendations = self.db.execute(_TOP_RECOMMENDATIONS, {"cv_id": cv_id}).all()
+        best_match_pathway = top_recommendations[0].pathway if top_recommendations else "N/A"
+        recommendation_scores = {
+            rec.pathway: round(rec.match_score * 100, 1) for rec in top_recommendations
+        }
+        
+        # Collect every per-entry column and label in a single pass, building
+        # the match score trend and recommendations evolution along the way
+        match_scores_list = []
+        skills_counts_list = []
+        period_days_list = []
+        month_labels = []
+        match_score_trend = []
+        recommendations_evolution = []
+        append_match_score = match_scores_list.append
+        append_skills_count = skills_counts_list.append
+        append_period_days = period_days_list.append
+        append_month_label = month_labels.append
+        append_match_score_point = match_score_trend.append
+        append_evolution_point = recommendations_evolution.append
+        previous_date = entries[0].date
+        for entry in entries:
+            date = entry.date
+            score = entry.top_match_score
+            append_match_score(score)
+            append_skills_count(entry.skills_count)
+            # Whole days since the previous entry. Taken from the datetimes
+            # here because converting them to datetime64 cost more than all
+            # of the array math below
+            append_period_days((date - previous_date).days)
+            previous_date = date
+            month_label, day_label, short_day_label = (
+                date.strftime(_ENTRY_LABELS_FORMAT).split("\n")
+            )
+            append_month_label(month_label)
+            append_match_score_point({
+                "date": day_label,
+                "score": round(score * 100, 1)
+            })
+            append_evolution_point({"date": short_day_label, **recommendation_scores})
+        
+        # Timeline columns as arrays, so per-period figures are computed in
+        # one vectorized step rather than entry by entry
+        match_scores = np.array(match_scores_list, dtype=np.float64)
+        skills_counts = np.array(skills_counts_list, dtype=np.int64)
+        # The first entry has no previous period
+        period_days = np.array(period_days_list[1:], dtype=np.int64)
+        period_velocities = (
+            np.diff(skills_counts) / np.maximum(period_days / 30, 1)
+        ).tolist()
+        
         # Calculate skill velocity (skills per month)
         time_span_days = (entries[-1].date - entries[0].date).days
         time_span_months = max(time_span_days / 30, 1)
-        total_skills_gained = entries[-1].skills_count - entries[0].skills_count
+        total_skills_gained = skills_counts_list[-1] - skills_counts_list[0]
         skill_velocity = total_skills_gained / time_span_months
         
         # Calculate match improvement rate
-        match_scores = [e.top_match_score for e in entries]
-        if len(match_scores) > 1:
-            improvements = [match_scores[i] - match_scores[i-1] for i in range(1, len(match_scores))]
-            match_improvement_rate = sum(improvements) / len(improvements)
-        else:
-            match_improvement_rate = 0.0
+        match_improvement_rate = float(np.diff(match_scores).mean())
         
         # Calculate average match score
-        average_match_score = sum(match_scores) / len(match_scores)
+        average_match_score = float(match_scores.mean())
         
         # Determine growth trend
         if len(entries) >= 3:
-            recent_velocity = (entries[-1].skills_count - entries[-2].skills_count) / max((entries[-1].date - entries[-2].date).days / 30, 1)
-            early_velocity = (entries[1].skills_count - entries[0].skills_count) / max((entries[1].date - entries[0].date).days / 30, 1)
+            recent_velocity = period_velocities[-1]
+            early_velocity = period_velocities[0]
             if recent_velocity > early_velocity * 1.2:
                 growth_trend = "accelerating"
             elif recent_velocity < early_velocity * 0.8:
@@ -178,62 +436,26 @@ class ProgressTracker:
         else:
             growth_trend = "steady"
         
-        # Get best match pathway from recommendations
-        recommendations = self.db.query(Recommendation).filter(
-            Recommendation.cv_id == cv_id
-        ).order_by(Recommendation.match_score.desc()).first()
-        best_match_pathway = recommendations.pathway if recommendations else "N/A"
-        
         # Build skill velocity trend
-        skill_velocity_trend = []
-        for i in range(1, len(entries)):
-            period_days = (entries[i].date - entries[i-1].date).days
-            period_months = max(period_days / 30, 1)
-            velocity = (entries[i].skills_count - entries[i-1].skills_count) / period_months
-            skill_velocity_trend.append({
-                "period": f"{entries[i-1].date.strftime('%b %Y')} - {entries[i].date.strftime('%b %Y')}",
+        skill_velocity_trend = [
+            {
+                "period": f"{month_labels[i]} - {month_labels[i + 1]}",
                 "velocity": round(velocity, 2)
-            })
-        
-        # Build match score trend
-        match_score_trend = []
-        for entry in entries:
-            match_score_trend.append({
-                "date": entry.date.strftime('%Y-%m-%d'),
-                "score": round(entry.top_match_score * 100, 1)
-            })
+            }
+            for i, velocity in enumerate(period_velocities)
+        ]
         
         # Category growth (from skills data)
+        # and learning velocity by category
         category_growth = []
-        skills = self.db.query(Skill).filter(Skill.cv_id == cv_id).all()
-        category_counts = {}
-        for skill in skills:
-            cat = skill.skill_category or "Other"
-            category_counts[cat] = category_counts.get(cat, 0) + 1
-        
-        for category, count in category_counts.items():
+        learning_velocity = {}
+        for category, count in self._skill_category_counts(cv_id).items():
             category_growth.append({
                 "category": category,
                 "count": count
             })
-        
-        # Learning velocity by category
-        learning_velocity = {}
-        for category, count in category_counts.items():
             learning_velocity[category] = round(count / time_span_months, 2)
         
-        # Recommendations evolution
-        recommendations_evolution = []
-        for entry in entries:
-            recs = self.db.query(Recommendation).filter(
-                Recommendation.cv_id == cv_id
-            ).order_by(Recommendation.match_score.desc()).limit(5).all()
-            
-            data_point = {"date": entry.date.strftime('%b %d')}
-            for rec in recs:
-                data_point[rec.pathway] = round(rec.match_score * 100, 1)
-            recommendations_evolution.append(data_point)
-        
         return {
             "skill_velocity": round(skill_velocity, 2),
             "match_improvement_rate": round(match_improvement_rate, 4),
@@ -302,6 +524,17 @@ class ProgressTracker:
             "status": skill.status
         } for skill in skills]
     
+    def _skill_category_counts(self, cv_id: int) -> Dict[str, int]:
+        """Count a CV's skills by category in the database, in order of first appearance"""
+        rows = self.db.execute(_SKILL_CATEGORY_COUNTS, {"cv_id": cv_id}).all()
+        
+        # Skills without a category are counted under "Other"
+        categories = {}
+        for category, count in rows:
+            category = category or "Other"
+            categories[category] = categories.get(category, 0) + count
+        return categories
+    
     def _count_skill_categories(self, skills: List[Skill]) -> Dict[str, int]:
         """Count skills by category"""
         categories = {}
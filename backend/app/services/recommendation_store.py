@@ -0,0 +1,98 @@
+"""
+Recommendation Store
+Converts CV rows to the recommender's input format and saves recommendations
+and AI insights, for the API and for offline scripts.
+"""
+
+from typing import Any, Dict, List
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import get_redis, invalidate_shared_reports
+from app.models.models import Recommendation, SharedReport, Skill, WorkExperience
+
+
+def skills_to_dicts(skills: List[Skill]) -> List[Dict]:
+    """Convert skills to the recommender's dictionary format"""
+    return [
+        {
+            'name': skill.skill_name,
+            'category': skill.skill_category,
+            'level': skill.skill_level,
+            'confidence': skill.confidence_score
+        }
+        for skill in skills
+    ]
+
+
+def work_experiences_to_dicts(work_experiences: List[WorkExperience]) -> List[Dict]:
+    """Convert work experiences to the recommender's dictionary format"""
+    return [
+        {
+            'job_title': exp.job_title,
+            'company_name': exp.company_name,
+            'start_date': exp.start_date,
+            'end_date': exp.end_date,
+            'duration_months': exp.duration_months,
+            'description': exp.description,
+            'technologies_used': exp.technologies_used,
+            'is_current': exp.is_current
+        }
+        for exp in work_experiences
+    ]
+
+
+async def save_recommendations(db: AsyncSession, cv_id: int, recommendations: List[Dict]):
+    """Replace the saved recommendations for a CV (the caller commits)"""
+    # Both statements run at the Core level: nothing in the session refers to
+    # these rows, so there is no identity map to synchronize or objects to build
+    # First, delete old recommendations for this CV
+    await db.execute(
+        delete(Recommendation)
+        .where(Recommendation.cv_id == cv_id)
+        .execution_options(synchronize_session=False)
+    )
+    
+    # Save new recommendations with one bulk INSERT
+    if recommendations:
+        await db.execute(
+            insert(Recommendation.__table__),
+            [
+                {
+                    "cv_id": cv_id,
+                    "pathway": rec_data['pathway'],
+                    "match_score": rec_data['match_score'],
+                    "reasoning": rec_data.get('reasoning', ''),
+                    "recommended_skills": rec_data.get('recommended_skills', []),
+                    "is_ai_enhanced": rec_data.get('is_ai_enhanced', False)
+                }
+                for rec_data in recommendations
+            ]
+        )
+
+
+async def invalidate_cached_reports(db: AsyncSession, cv_ids: List[int]):
+    """Shared reports embed recommendations, so drop any cached copies for these CVs"""
+    if get_redis() is not None:
+        share_tokens = (
+            await db.execute(
+                select(SharedReport.share_token).where(SharedReport.cv_id.in_(cv_ids))
+            )
+        ).scalars().all()
+        invalidate_shared_reports(*share_tokens)
+
+
+async def store_ai_insight(db: AsyncSession, cv_id: int, ai_data: Dict[str, Any]):
+    """Attach AI insights to the best saved recommendation of a CV (the caller commits)"""
+    # Ties keep insertion order, matching the recommender's stable sort
+    top_recommendation_id = (
+        select(Recommendation.id)
+        .where(Recommendation.cv_id == cv_id)
+        .order_by(Recommendation.match_score.desc(), Recommendation.id)
+        .limit(1)
+        .scalar_subquery()
+    )
+    await db.execute(
+        update(Recommendation)
+        .where(Recommendation.id == top_recommendation_id)
+        .values(is_ai_enhanced=True, ai_insight=ai_data)
+    )
@@ -1,9 +1,339 @@
+import heapq
 import json
 from typing import List, Dict, Optional, Tuple
 from pathlib import Path
+from functools import lru_cache
 from collections import defaultdict
 from datetime import datetime
+import math
 import re
+import threading
+
+import numpy as np
+from cachetools import LRUCache
+
+from app.core.serialization import json_dumps, json_loads
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# Pathways whose match benefits from experience at tech companies
+_TECH_ROLES = frozenset([
+    'frontend developer', 'backend developer', 'full stack developer',
+    'devops engineer', 'data scientist', 'android developer', 'ios developer',
+    'react native developer', 'software architect', 'blockchain developer'
+])
+
+# Pathways whose relevant experience counts extra when it was at a tech company
+_TECH_CONTEXT_PATHWAYS = frozenset([
+    'frontend developer', 'backend developer', 'full stack developer',
+    'devops engineer', 'mobile developer', 'data scientist'
+])
+
+# Keywords that tie a work experience to each career pathway, with comprehensive terms
+_PATHWAY_KEYWORDS = {
+    'frontend developer': [
+        'frontend', 'front-end', 'front end', 'ui developer', 'ui engineer',
+        'react', 'react.js', 'reactjs', 'vue', 'vue.js', 'vuejs', 
+        'angular', 'angularjs', 'svelte', 'next.js', 'nextjs',
+        'javascript developer', 'js developer', 'typescript developer',
+        'web developer', 'web ui', 'html', 'css', 'sass', 'less',
+        'responsive design', 'web design', 'ux developer', 'ui/ux developer',
+        'junior frontend', 'senior frontend', 'lead frontend', 'staff frontend'
+    ],
+    'backend developer': [
+        'backend', 'back-end', 'back end', 'server-side', 'server side',
+        'api developer', 'rest api', 'graphql', 'api engineer',
+        'node', 'node.js', 'nodejs', 'express', 'nest.js',
+        'python', 'django', 'flask', 'fastapi', 'python engineer',
+        'java', 'spring', 'spring boot', 'java engineer',
+        'c#', '.net', 'asp.net', 'dotnet',
+        'go', 'golang', 'go developer', 'rust developer',
+        'php', 'laravel', 'symfony',
+        'ruby', 'rails', 'ruby on rails',
+        'database', 'sql', 'postgresql', 'mysql', 'mongodb',
+        'microservices', 'distributed systems',
+        'junior backend', 'senior backend', 'lead backend', 'staff backend'
+    ],
+    'full stack developer': [
+        'full stack', 'fullstack', 'full-stack', 'full stack engineer',
+        'mern', 'mean', 'mevn', 'lamp', 'jamstack',
+        'web application', 'application developer',
+        'software developer', 'software engineer',
+        'junior full stack', 'senior full stack', 'lead full stack'
+    ],
+    'devops engineer': [
+        'devops', 'dev ops', 'devsecops', 'site reliability', 'sre',
+        'infrastructure', 'infrastructure engineer', 'platform engineer',
+        'cloud', 'cloud engineer', 'cloud architect',
+        'aws', 'amazon web services', 'azure', 'microsoft azure', 'gcp', 'google cloud',
+        'kubernetes', 'k8s', 'docker', 'containerization', 'containers',
+        'ci/cd', 'continuous integration', 'jenkins', 'gitlab ci', 'github actions',
+        'terraform', 'ansible', 'chef', 'puppet', 'infrastructure as code',
+        'monitoring', 'prometheus', 'grafana', 'elk', 'datadog',
+        'linux', 'unix', 'systems engineer', 'systems administrator',
+        'junior devops', 'senior devops', 'lead devops', 'staff devops'
+    ],
+    'data scientist': [
+        'data scientist', 'data science', 'data analyst', 'analytics',
+        'machine learning', 'ml engineer', 'ml', 'ai engineer', 'artificial intelligence',
+        'deep learning', 'neural network', 'computer vision', 'nlp',
+        'python', 'r', 'pandas', 'numpy', 'scikit-learn', 'tensorflow', 'pytorch',
+        'statistics', 'statistical', 'quantitative', 'research scientist',
+        'data mining', 'predictive modeling', 'data modeling',
+        'bi', 'business intelligence', 'tableau', 'power bi',
+        'junior data scientist', 'senior data scientist', 'lead data scientist'
+    ],
+    'android developer': [
+        'android', 'android developer', 'android engineer',
+        'kotlin', 'java android', 'android studio',
+        'mobile app', 'mobile application', 'mobile engineer',
+        'jetpack compose', 'android sdk', 'google play',
+        'junior android', 'senior android', 'lead android'
+    ],
+    'ios developer': [
+        'ios', 'ios developer', 'ios engineer',
+        'swift', 'objective-c', 'objective c',
+        'xcode', 'app store', 'apple',
+        'swiftui', 'uikit', 'cocoa',
+        'mobile app', 'mobile application', 'mobile engineer',
+        'junior ios', 'senior ios', 'lead ios'
+    ],
+    'react native developer': [
+        'react native', 'react-native', 'cross-platform mobile',
+        'mobile developer', 'hybrid app', 'expo',
+        'junior react native', 'senior react native'
+    ],
+    'software architect': [
+        'architect', 'software architect', 'solution architect', 'enterprise architect',
+        'technical architect', 'system architect', 'cloud architect',
+        'principal engineer', 'principal', 'distinguished engineer',
+        'staff engineer', 'staff software engineer',
+        'technical lead', 'tech lead', 'engineering lead',
+        'system design', 'architecture', 'design patterns'
+    ],
+    'qa engineer': [
+        'qa', 'quality assurance', 'qa engineer', 'quality engineer',
+        'tester', 'test engineer', 'testing', 'software tester',
+        'automation', 'test automation', 'automation engineer',
+        'selenium', 'cypress', 'jest', 'pytest', 'junit',
+        'manual testing', 'automated testing', 'performance testing',
+        'load testing', 'api testing', 'integration testing',
+        'junior qa', 'senior qa', 'lead qa', 'qa lead'
+    ],
+    'blockchain developer': [
+        'blockchain', 'blockchain developer', 'blockchain engineer',
+        'solidity', 'ethereum', 'web3', 'smart contract',
+        'crypto', 'cryptocurrency', 'defi', 'nft',
+        'hyperledger', 'truffle', 'hardhat',
+        'junior blockchain', 'senior blockchain'
+    ],
+    'game developer': [
+        'game', 'game developer', 'game engineer', 'game designer',
+        'unity', 'unreal', 'unreal engine', 'game engine',
+        'c++', 'c#', '3d', 'graphics', 'gameplay',
+        'junior game developer', 'senior game developer'
+    ],
+    'cyber security specialist': [
+        'security', 'cybersecurity', 'cyber security', 'infosec', 'information security',
+        'security engineer', 'security analyst', 'security specialist',
+        'penetration testing', 'pentesting', 'ethical hacking', 'security testing',
+        'threat', 'vulnerability', 'compliance', 'risk',
+        'soc', 'security operations', 'incident response',
+        'cissp', 'ceh', 'security+',
+        'junior security', 'senior security', 'lead security'
+    ],
+    'product manager': [
+        'product manager', 'product owner', 'pm', 'po',
+        'product', 'product lead', 'senior product manager',
+        'technical product manager', 'tpm',
+        'product strategy', 'product development'
+    ],
+    'data analyst': [
+        'data analyst', 'business analyst', 'analytics',
+        'sql analyst', 'reporting analyst', 'bi analyst',
+        'excel', 'tableau', 'power bi', 'looker', 'sql',
+        'junior data analyst', 'senior data analyst'
+    ]
+}
+
+# A four-digit year in an end date
+_YEAR_RE = re.compile(r'(\d{4})')
+
+# End dates that count as recent experience in the reasoning
+_RECENT_END_DATE_RE = re.compile(r'(202[3-9]|present)')
+
+# Alternative spellings of skills, folded into the name the pathways use
+_SKILL_ALIASES = {
+    'js': 'javascript',
+    'ecmascript': 'javascript',
+    'ts': 'typescript',
+    'reactjs': 'react',
+    'react.js': 'react',
+    'vuejs': 'vue',
+    'vue.js': 'vue',
+    'angularjs': 'angular',
+    'nextjs': 'next.js',
+    'nodejs': 'node.js',
+    'node': 'node.js',
+    'html5': 'html',
+    'css3': 'css',
+    'scss': 'sass',
+    'tailwindcss': 'tailwind',
+    'tailwind css': 'tailwind',
+    'golang': 'go',
+    'csharp': 'c#',
+    'cpp': 'c++',
+    'objective c': 'objective-c',
+    'postgres': 'postgresql',
+    'mongo': 'mongodb',
+    'k8s': 'kubernetes',
+    'google cloud': 'gcp',
+    'google cloud platform': 'gcp',
+    'amazon web services': 'aws',
+    'microsoft azure': 'azure',
+    'rest': 'rest api',
+    'restful api': 'rest api',
+    'sklearn': 'scikit-learn',
+    'ml': 'machine learning',
+    'react-native': 'react native',
+    'unreal': 'unreal engine',
+}
+
+# The work experience fields recommendations depend on (start dates order
+# the career trajectory)
+_EXPERIENCE_FIELDS = (
+    'job_title', 'company_name', 'description', 'duration_months',
+    'start_date', 'end_date', 'is_current'
+)
+
+# Every pathway keyword, once
+_ALL_KEYWORDS = tuple(dict.fromkeys(
+    keyword for keywords in _PATHWAY_KEYWORDS.values() for keyword in keywords
+))
+
+
+def _build_keyword_automaton():
+    """Build an Aho-Corasick automaton that finds all pathway keywords in one scan"""
+    automaton = ahocorasick.Automaton()
+    for keyword in _ALL_KEYWORDS:
+        automaton.add_word(keyword, keyword)
+    automaton.make_automaton()
+    return automaton
+
+
+_KEYWORD_AUTOMATON = _build_keyword_automaton() if AHOCORASICK_AVAILABLE else None
+
+
+def _find_keywords(title: str, description: str, company: str) -> Tuple[set, set, set]:
+    """Find the pathway keywords that occur in each field (as substrings, like `in`)"""
+    if _KEYWORD_AUTOMATON is not None:
+        return tuple(
+            {keyword for _, keyword in _KEYWORD_AUTOMATON.iter(text)}
+            for text in (title, description, company)
+        )
+    
+    # No keyword spans a newline, so this narrows the keywords down with a
+    # single scan per keyword before checking the fields
+    combined = "\n".join((title, description, company))
+    found = [keyword for keyword in _ALL_KEYWORDS if keyword in combined]
+    return tuple(
+        {keyword for keyword in found if keyword in text}
+        for text in (title, description, company)
+    )
+
+
+@lru_cache(maxsize=1024)
+def _canonicalize_skill(skill_name: str) -> str:
+    """Lowercase a skill name and fold known aliases into their canonical name"""
+    name = skill_name.strip().lower()
+    return _SKILL_ALIASES.get(name, name)
+
+
+@lru_cache(maxsize=512)
+def _detect_seniority_level(job_title: str) -> int:
+    """
+    Detect seniority level from job title.
+    Returns a score from 0 (entry) to 5 (executive)
+    """
+    if not job_title:
+        return 1  # Default to entry level
+    
+    title_lower = job_title.lower()
+    
+    # Executive/Director level (5)
+    if any(keyword in title_lower for keyword in ['cto', 'cio', 'vp', 'vice president', 'director', 'head of', 'chief']):
+        return 5
+    
+    # Principal/Staff level (4)
+    if any(keyword in title_lower for keyword in ['principal', 'staff', 'distinguished', 'fellow']):
+        return 4
+    
+    # Lead/Senior level (3)
+    if any(keyword in title_lower for keyword in ['lead', 'senior', 'sr.', 'sr ']):
+        return 3
+    
+    # Mid level (2)
+    if any(keyword in title_lower for keyword in ['engineer', 'developer', 'analyst', 'designer', 'architect']) and \
+       not any(keyword in title_lower for keyword in ['junior', 'jr', 'associate', 'intern', 'entry']):
+        return 2
+    
+    # Junior/Entry level (1)
+    if any(keyword in title_lower for keyword in ['junior', 'jr.', 'jr ', 'associate', 'entry']):
+        return 1
+    
+    # Intern level (0)
+    if any(keyword in title_lower for keyword in ['intern', 'trainee', 'apprentice']):
+        return 0
+    
+    return 1  # Default to entry level
+
+
+@lru_cache(maxsize=512)
+def _recency_weight(end_date: str, is_current: bool, current_year: int) -> float:
+    """
+    Calculate recency weight using exponential decay.
+    Recent experience (last 2-3 years) weighted more heavily.
+    Returns weight between 0.3 (old) and 1.0 (current/recent).
+    The current year is an argument so cached weights never outlive it.
+    """
+    if is_current:
+        return 1.0
+    
+    if not end_date or end_date.lower() == 'present':
+        return 1.0
+    
+    try:
+        # Try to extract year from end_date
+        year_match = _YEAR_RE.search(end_date)
+        if year_match:
+            end_year = int(year_match.group(1))
+            years_ago = current_year - end_year
+            
+            # Exponential decay: weight = e^(-0.3 * years_ago)
+            # Current: 1.0, 1 year: 0.74, 2 years: 0.55, 3 years: 0.41, 5 years: 0.22
+            weight = math.exp(-0.3 * years_ago)
+            
+            # Clamp between 0.3 and 1.0
+            return max(0.3, min(1.0, weight))
+    except Exception:
+        pass
+    
+    # Default to moderate weight if we can't parse
+    return 0.6
+
+
+def _recency_key(experience: Dict) -> tuple:
+    """Order experiences by recency (current jobs first, then by end date)"""
+    return (experience.get('is_current', False), experience.get('end_date', ''))
+
+
+def _calculate_recency_weight(end_date: str, is_current: bool) -> float:
+    """Recency weight of an experience ending at end_date, as of this year"""
+    return _recency_weight(end_date, is_current, datetime.now().year)
 
 
 class CareerRecommender:
@@ -11,6 +341,16 @@ class CareerRecommender:
     
     def __init__(self):
         self.pathways = self._load_pathways()
+        self._build_score_matrices()
+        
+        # Pathways by lowercased name (the first wins, as in a linear search)
+        self._pathway_by_lower = {}
+        for pathway in self.pathways:
+            self._pathway_by_lower.setdefault(pathway['name'].lower(), pathway)
+        
+        # Recommendations (as JSON) keyed by their normalized inputs
+        self._recommendation_cache = LRUCache(maxsize=1024)
+        self._recommendation_cache_lock = threading.Lock()
     
     def _load_pathways(self) -> List[Dict]:
         """Load career pathways from JSON file"""
@@ -24,6 +364,55 @@ class CareerRecommender:
             data = json.load(f)
             return data.get('pathways', [])
     
+    def _build_score_matrices(self):
+        """
+        Precompute the skill and category matching as matrices so a CV is
+        scored against every pathway with a few matrix-vector products.
+        
+        Rows are pathways. Skill columns count how often a (lowercased) skill
+        appears in a pathway's required/optional list; category columns hold
+        each pathway's normalized category weights. The lowercased skill sets
+        themselves are kept per row for finding a CV's missing skills.
+        """
+        skill_index = {}
+        category_index = {}
+        for pathway in self.pathways:
+            for skill in pathway.get('required_skills', []) + pathway.get('optional_skills', []):
+                skill_index.setdefault(skill.lower(), len(skill_index))
+            for category in pathway.get('weight_categories', {}):
+                category_index.setdefault(category, len(category_index))
+        
+        num_pathways = len(self.pathways)
+        required = np.zeros((num_pathways, len(skill_index)))
+        optional = np.zeros((num_pathways, len(skill_index)))
+        category_weights = np.zeros((num_pathways, len(category_index)))
+        required_sets = []
+        optional_sets = []
+        
+        for row, pathway in enumerate(self.pathways):
+            for skill in pathway.get('required_skills', []):
+                required[row, skill_index[skill.lower()]] += 1
+            for skill in pathway.get('optional_skills', []):
+                optional[row, skill_index[skill.lower()]] += 1
+            required_sets.append(frozenset(s.lower() for s in pathway.get('required_skills', [])))
+            optional_sets.append(frozenset(s.lower() for s in pathway.get('optional_skills', [])))
+            
+            weight_categories = pathway.get('weight_categories', {})
+            if weight_categories:
+                total_weight = sum(weight_categories.values())
+                for category, weight in weight_categories.items():
+                    category_weights[row, category_index[category]] = weight / total_weight
+        
+        self._skill_index = skill_index
+        self._category_index = category_index
+        self._required_matrix = required
+        self._optional_matrix = optional
+        self._required_totals = required.sum(axis=1)
+        self._optional_totals = optional.sum(axis=1)
+        self._category_weights = category_weights
+        self._required_skill_sets = required_sets
+        self._optional_skill_sets = optional_sets
+    
     def recommend_pathways(
         self, 
         skills: List[Dict[str, any]], 
@@ -46,8 +435,41 @@ class CareerRecommender:
         if not skills:
             return []
         
-        # Extract skill names and categories
-        skill_names = [s['name'].lower() for s in skills]
+        # Skill order stays in the key: it breaks ties between categories in
+        # the reasoning. Recency weights depend on the current year
+        key = (
+            tuple((_canonicalize_skill(s['name']), s.get('category', 'general')) for s in skills),
+            tuple(
+                tuple((field, exp[field]) for field in _EXPERIENCE_FIELDS if field in exp)
+                for exp in work_experiences or []
+            ),
+            top_n,
+            min_score,
+            datetime.now().year
+        )
+        with self._recommendation_cache_lock:
+            recommendations_json = self._recommendation_cache.get(key)
+        
+        if recommendations_json is None:
+            recommendations_json = json_dumps(
+                self._build_recommendations(skills, work_experiences, top_n, min_score)
+            )
+            with self._recommendation_cache_lock:
+                self._recommendation_cache[key] = recommendations_json
+        
+        # Callers get a fresh copy, so changes to it never reach the cache
+        return json_loads(recommendations_json)
+    
+    def _build_recommendations(
+        self,
+        skills: List[Dict[str, any]],
+        work_experiences: Optional[List[Dict[str, any]]],
+        top_n: int,
+        min_score: float
+    ) -> List[Dict[str, any]]:
+        """Build recommendations from scratch (see recommend_pathways)"""
+        # Extract skill names (with aliases folded, so "React.js" matches "React") and categories
+        skill_name_set = {_canonicalize_skill(s['name']) for s in skills}
         skill_categories = defaultdict(int)
         
         for skill in skills:
@@ -57,42 +479,77 @@ class CareerRecommender:
         # Process work experience
         experience_data = self._process_work_experience(work_experiences or [])
         
+        # Score skills and categories against all pathways at once
+        skill_vector = np.zeros(len(self._skill_index))
+        for name in skill_name_set:
+            index = self._skill_index.get(name)
+            if index is not None:
+                skill_vector[index] = 1
+        
+        category_vector = np.zeros(len(self._category_index))
+        for category, count in skill_categories.items():
+            index = self._category_index.get(category)
+            if index is not None:
+                category_vector[index] = min(count / 5, 1)
+        
+        required_matches = self._required_matrix @ skill_vector
+        optional_matches = self._optional_matrix @ skill_vector
+        category_scores = self._category_weights @ category_vector
+        
+        # Experience figures shared by every pathway, looked up once
+        relevance_scores = experience_data.get('relevance_scores', {})
+        relevant_roles_by_pathway = experience_data.get('relevant_roles', {})
+        total_months = experience_data.get('total_months', 0)
+        career_progression_score = experience_data.get('career_trajectory', {}).get('progression_score', 0.5)
+        tech_ratio = experience_data.get('tech_experience_ratio', 0.0)
+        
         recommendations = []
         
-        for pathway in self.pathways:
-            score, reasoning = self._calculate_pathway_match(
-                pathway, 
-                skill_names, 
-                skill_categories,
-                skills,
-                experience_data
+        for row, pathway in enumerate(self.pathways):
+            pathway_name_lower = pathway['name'].lower()
+            experience_relevance = relevance_scores.get(pathway_name_lower, 0)
+            
+            score = self._calculate_pathway_match(
+                pathway_name_lower,
+                int(required_matches[row]),
+                int(self._required_totals[row]),
+                int(optional_matches[row]),
+                int(self._optional_totals[row]),
+                float(category_scores[row]),
+                experience_relevance,
+                total_months,
+                career_progression_score,
+                tech_ratio
             )
             
             if score >= min_score:
-                # Get recommended skills to learn
-                recommended_skills = self._get_missing_skills(pathway, skill_names)
+                # Relevant experiences for this pathway and the most recent of
+                # them, found once for the reasoning and the recency boost
+                relevant_roles = relevant_roles_by_pathway.get(pathway_name_lower, [])
+                most_recent = max(relevant_roles, key=_recency_key) if relevant_roles else None
                 
-                # Calculate additional scoring metrics
-                pathway_name_lower = pathway['name'].lower()
-                experience_relevance = experience_data.get('relevance_scores', {}).get(pathway_name_lower, 0)
+                reasoning = self._generate_reasoning(
+                    pathway['name'],
+                    int(required_matches[row]),
+                    int(self._required_totals[row]),
+                    int(optional_matches[row]),
+                    skill_categories,
+                    pathway.get('weight_categories', {}),
+                    experience_data,
+                    relevant_roles,
+                    most_recent
+                )
                 
-                # Career progression score
-                career_trajectory = experience_data.get('career_trajectory', {})
-                career_progression_score = career_trajectory.get('progression_score', 0.5)
+                # Get recommended skills to learn
+                recommended_skills = self._get_missing_skills(row, skill_name_set)
                 
                 # Company context match (tech ratio for tech roles)
-                tech_ratio = experience_data.get('tech_experience_ratio', 0.0)
-                tech_roles = ['frontend developer', 'backend developer', 'full stack developer', 
-                              'devops engineer', 'data scientist', 'android developer', 'ios developer',
-                              'react native developer', 'software architect', 'blockchain developer']
-                company_context_match = tech_ratio if pathway_name_lower in tech_roles else 0.5
+                company_context_match = tech_ratio if pathway_name_lower in _TECH_ROLES else 0.5
                 
                 # Recency boost - calculate from most recent relevant experience
-                relevant_roles = experience_data.get('relevant_roles', {}).get(pathway_name_lower, [])
                 recency_boost = 0.0
-                if relevant_roles:
-                    most_recent = sorted(relevant_roles, key=lambda x: (x.get('is_current', False), x.get('end_date', '')), reverse=True)[0]
-                    recency_boost = self._calculate_recency_weight(most_recent.get('end_date', ''), most_recent.get('is_current', False))
+                if most_recent is not None:
+                    recency_boost = _calculate_recency_weight(most_recent.get('end_date', ''), most_recent.get('is_current', False))
                 
                 recommendations.append({
                     'pathway': pathway['name'],
@@ -107,60 +564,40 @@ class CareerRecommender:
                     'recency_boost': round(recency_boost, 2)
                 })
         
-        # Sort by score and return top N
-        recommendations.sort(key=lambda x: x['match_score'], reverse=True)
-        return recommendations[:top_n]
+        # Return the top N by score (ties keep pathway order, as a stable sort would)
+        return heapq.nlargest(top_n, recommendations, key=lambda x: x['match_score'])
     
     def _calculate_pathway_match(
         self, 
-        pathway: Dict, 
-        skill_names: List[str],
-        skill_categories: Dict[str, int],
-        all_skills: List[Dict],
-        experience_data: Dict
-    ) -> Tuple[float, str]:
-        """Calculate how well skills and experience match a pathway with enhanced scoring"""
-        
-        # Required skills matching
-        required_skills = [s.lower() for s in pathway.get('required_skills', [])]
-        required_matches = sum(1 for skill in required_skills if skill in skill_names)
-        required_score = required_matches / len(required_skills) if required_skills else 0
-        
-        # Optional skills matching
-        optional_skills = [s.lower() for s in pathway.get('optional_skills', [])]
-        optional_matches = sum(1 for skill in optional_skills if skill in skill_names)
-        optional_score = optional_matches / len(optional_skills) if optional_skills else 0
-        
-        # Category weight matching
-        category_score = 0
-        weight_categories = pathway.get('weight_categories', {})
-        
-        if weight_categories:
-            total_weight = sum(weight_categories.values())
-            for category, weight in weight_categories.items():
-                if category in skill_categories:
-                    normalized_weight = weight / total_weight
-                    category_score += normalized_weight * min(skill_categories[category] / 5, 1)
-        
-        # Experience relevance score (already recency-weighted)
-        pathway_name_lower = pathway['name'].lower()
-        experience_score = experience_data.get('relevance_scores', {}).get(pathway_name_lower, 0)
+        pathway_name_lower: str, 
+        required_matches: int,
+        total_required: int,
+        optional_matches: int,
+        total_optional: int,
+        category_score: float,
+        experience_score: float,
+        total_months: int,
+        progression_score: float,
+        tech_ratio: float
+    ) -> float:
+        """
+        Calculate how well skills and experience match a pathway with enhanced scoring.
+        experience_score is the pathway's (already recency-weighted) experience relevance.
+        """
+        
+        # Required and optional skills matching
+        required_score = required_matches / total_required if total_required else 0
+        optional_score = optional_matches / total_optional if total_optional else 0
         
         # Experience duration bonus
-        experience_years_bonus = min(experience_data.get('total_months', 0) / 120, 0.15)  # Max 15% bonus for 10+ years
+        experience_years_bonus = min(total_months / 120, 0.15)  # Max 15% bonus for 10+ years
         
         # Career progression bonus (up to 10% bonus for upward trajectory)
-        career_trajectory = experience_data.get('career_trajectory', {})
-        progression_score = career_trajectory.get('progression_score', 0.5)
         progression_bonus = (progression_score - 0.5) * 0.1  # Range: -0.05 to +0.05 (centered at 0)
         
         # Company context bonus (tech experience bonus for tech roles)
-        tech_ratio = experience_data.get('tech_experience_ratio', 0.0)
-        tech_roles = ['frontend developer', 'backend developer', 'full stack developer', 
-                      'devops engineer', 'data scientist', 'android developer', 'ios developer',
-                      'react native developer', 'software architect', 'blockchain developer']
         company_context_bonus = 0.0
-        if pathway_name_lower in tech_roles and tech_ratio > 0.5:
+        if pathway_name_lower in _TECH_ROLES and tech_ratio > 0.5:
             company_context_bonus = 0.05  # 5% bonus for significant tech experience
         
         # Calculate final score with weights (adjusted to be more lenient)
@@ -177,18 +614,7 @@ class CareerRecommender:
         final_score = base_score + experience_component
         final_score = min(max(final_score, 0.0), 1.0)  # Clamp between 0 and 1
         
-        # Generate reasoning with enhanced context
-        reasoning = self._generate_reasoning(
-            pathway['name'],
-            required_matches,
-            len(required_skills),
-            optional_matches,
-            skill_categories,
-            weight_categories,
-            experience_data
-        )
-        
-        return final_score, reasoning
+        return final_score
     
     def _generate_reasoning(
         self,
@@ -198,7 +624,9 @@ class CareerRecommender:
         optional_matches: int,
         skill_categories: Dict[str, int],
         weight_categories: Dict[str, str],
-        experience_data: Dict
+        experience_data: Dict,
+        relevant_roles: List[Dict],
+        most_recent: Optional[Dict]
     ) -> str:
         """Generate human-readable reasoning for the match with enhanced context"""
         
@@ -224,19 +652,14 @@ class CareerRecommender:
             reasons.append("Your career transition shows adaptability and growth mindset")
         
         # Work experience with recency context
-        relevant_roles = experience_data.get('relevant_roles', {}).get(pathway_name.lower(), [])
         if relevant_roles:
-            # Sort by recency (current jobs first)
-            sorted_roles = sorted(relevant_roles, key=lambda x: (x.get('is_current', False), x.get('end_date', '')), reverse=True)
-            most_recent = sorted_roles[0]
-            
             years = sum(r.get('duration_months', 0) for r in relevant_roles) / 12
             roles_text = most_recent.get('job_title', 'related role')
             
             # Check if recent experience
             is_recent = most_recent.get('is_current', False) or \
                        (most_recent.get('end_date', '') and 
-                        re.search(r'(202[3-9]|present)', most_recent.get('end_date', '').lower()))
+                        _RECENT_END_DATE_RE.search(most_recent.get('end_date', '').lower()))
             
             if is_recent and len(relevant_roles) > 1:
                 reasons.append(f"Currently building on {years:.1f} years of relevant experience as {roles_text}")
@@ -285,15 +708,11 @@ class CareerRecommender:
         else:
             return f"Some foundational skills for {pathway_name}."
     
-    def _get_missing_skills(self, pathway: Dict, current_skills: List[str]) -> List[str]:
-        """Get skills that are in the pathway but not in current skills"""
-        required = set(s.lower() for s in pathway.get('required_skills', []))
-        optional = set(s.lower() for s in pathway.get('optional_skills', []))
-        current = set(current_skills)
-        
+    def _get_missing_skills(self, row: int, current_skills: set) -> List[str]:
+        """Get skills that are in the pathway (by matrix row) but not in current skills"""
         # Prioritize missing required skills, then optional
-        missing_required = list(required - current)
-        missing_optional = list(optional - current)
+        missing_required = list(self._required_skill_sets[row] - current_skills)
+        missing_optional = list(self._optional_skill_sets[row] - current_skills)
         
         # Return with capitalization
         missing = missing_required + missing_optional
@@ -301,10 +720,7 @@ class CareerRecommender:
     
     def get_pathway_by_name(self, name: str) -> Optional[Dict]:
         """Get a specific pathway by name"""
-        for pathway in self.pathways:
-            if pathway['name'].lower() == name.lower():
-                return pathway
-        return None
+        return self._pathway_by_lower.get(name.lower())
     
     def get_all_pathways(self) -> List[Dict]:
         """Get all available pathways"""
@@ -322,194 +738,77 @@ class CareerRecommender:
                 'tech_experience_ratio': 0.0
             }
         
-        # Calculate total experience
-        total_months = sum(exp.get('duration_months', 0) or 0 for exp in work_experiences)
-        
         # Analyze career trajectory
         career_trajectory = self._analyze_career_trajectory(work_experiences)
         
-        # Extract company contexts and calculate tech experience ratio
-        company_contexts = []
+        # One pass over the experiences for the totals, the company contexts
+        # and everything the pathway matching below reads from each of them
+        total_months = 0
         tech_months = 0
+        company_contexts = []
+        prepped = []
         for exp in work_experiences:
+            duration_months = exp.get('duration_months', 0) or 0
+            total_months += duration_months
+            
             context = self._extract_company_context(
                 exp.get('company_name', ''),
                 exp.get('description', '')
             )
             company_contexts.append(context)
-            
             if context['is_tech']:
-                tech_months += exp.get('duration_months', 0) or 0
+                tech_months += duration_months
+            
+            # The keywords in each field, found once for all pathways
+            keywords = _find_keywords(
+                (exp.get('job_title', '') or '').lower(),
+                (exp.get('description', '') or '').lower(),
+                (exp.get('company_name', '') or '').lower()
+            )
+            
+            # Recency only counts for experiences that match some pathway
+            recency_weight = 0.0
+            if any(keywords):
+                recency_weight = _calculate_recency_weight(
+                    exp.get('end_date', ''),
+                    exp.get('is_current', False)
+                )
+            
+            prepped.append((
+                exp,
+                keywords,
+                min(duration_months / 12, 1.0),  # Duration weight, up to 1 year max
+                recency_weight,
+                context['is_tech']
+            ))
         
         tech_experience_ratio = tech_months / total_months if total_months > 0 else 0.0
         
-        # Enhanced keyword mapping for career pathways with comprehensive terms
-        pathway_keywords = {
-            'frontend developer': [
-                'frontend', 'front-end', 'front end', 'ui developer', 'ui engineer',
-                'react', 'react.js', 'reactjs', 'vue', 'vue.js', 'vuejs', 
-                'angular', 'angularjs', 'svelte', 'next.js', 'nextjs',
-                'javascript developer', 'js developer', 'typescript developer',
-                'web developer', 'web ui', 'html', 'css', 'sass', 'less',
-                'responsive design', 'web design', 'ux developer', 'ui/ux developer',
-                'junior frontend', 'senior frontend', 'lead frontend', 'staff frontend'
-            ],
-            'backend developer': [
-                'backend', 'back-end', 'back end', 'server-side', 'server side',
-                'api developer', 'rest api', 'graphql', 'api engineer',
-                'node', 'node.js', 'nodejs', 'express', 'nest.js',
-                'python', 'django', 'flask', 'fastapi', 'python engineer',
-                'java', 'spring', 'spring boot', 'java engineer',
-                'c#', '.net', 'asp.net', 'dotnet',
-                'go', 'golang', 'go developer', 'rust developer',
-                'php', 'laravel', 'symfony',
-                'ruby', 'rails', 'ruby on rails',
-                'database', 'sql', 'postgresql', 'mysql', 'mongodb',
-                'microservices', 'distributed systems',
-                'junior backend', 'senior backend', 'lead backend', 'staff backend'
-            ],
-            'full stack developer': [
-                'full stack', 'fullstack', 'full-stack', 'full stack engineer',
-                'mern', 'mean', 'mevn', 'lamp', 'jamstack',
-                'web application', 'application developer',
-                'software developer', 'software engineer',
-                'junior full stack', 'senior full stack', 'lead full stack'
-            ],
-            'devops engineer': [
-                'devops', 'dev ops', 'devsecops', 'site reliability', 'sre',
-                'infrastructure', 'infrastructure engineer', 'platform engineer',
-                'cloud', 'cloud engineer', 'cloud architect',
-                'aws', 'amazon web services', 'azure', 'microsoft azure', 'gcp', 'google cloud',
-                'kubernetes', 'k8s', 'docker', 'containerization', 'containers',
-                'ci/cd', 'continuous integration', 'jenkins', 'gitlab ci', 'github actions',
-                'terraform', 'ansible', 'chef', 'puppet', 'infrastructure as code',
-                'monitoring', 'prometheus', 'grafana', 'elk', 'datadog',
-                'linux', 'unix', 'systems engineer', 'systems administrator',
-                'junior devops', 'senior devops', 'lead devops', 'staff devops'
-            ],
-            'data scientist': [
-                'data scientist', 'data science', 'data analyst', 'analytics',
-                'machine learning', 'ml engineer', 'ml', 'ai engineer', 'artificial intelligence',
-                'deep learning', 'neural network', 'computer vision', 'nlp',
-                'python', 'r', 'pandas', 'numpy', 'scikit-learn', 'tensorflow', 'pytorch',
-                'statistics', 'statistical', 'quantitative', 'research scientist',
-                'data mining', 'predictive modeling', 'data modeling',
-                'bi', 'business intelligence', 'tableau', 'power bi',
-                'junior data scientist', 'senior data scientist', 'lead data scientist'
-            ],
-            'android developer': [
-                'android', 'android developer', 'android engineer',
-                'kotlin', 'java android', 'android studio',
-                'mobile app', 'mobile application', 'mobile engineer',
-                'jetpack compose', 'android sdk', 'google play',
-                'junior android', 'senior android', 'lead android'
-            ],
-            'ios developer': [
-                'ios', 'ios developer', 'ios engineer',
-                'swift', 'objective-c', 'objective c',
-                'xcode', 'app store', 'apple',
-                'swiftui', 'uikit', 'cocoa',
-                'mobile app', 'mobile application', 'mobile engineer',
-                'junior ios', 'senior ios', 'lead ios'
-            ],
-            'react native developer': [
-                'react native', 'react-native', 'cross-platform mobile',
-                'mobile developer', 'hybrid app', 'expo',
-                'junior react native', 'senior react native'
-            ],
-            'software architect': [
-                'architect', 'software architect', 'solution architect', 'enterprise architect',
-                'technical architect', 'system architect', 'cloud architect',
-                'principal engineer', 'principal', 'distinguished engineer',
-                'staff engineer', 'staff software engineer',
-                'technical lead', 'tech lead', 'engineering lead',
-                'system design', 'architecture', 'design patterns'
-            ],
-            'qa engineer': [
-                'qa', 'quality assurance', 'qa engineer', 'quality engineer',
-                'tester', 'test engineer', 'testing', 'software tester',
-                'automation', 'test automation', 'automation engineer',
-                'selenium', 'cypress', 'jest', 'pytest', 'junit',
-                'manual testing', 'automated testing', 'performance testing',
-                'load testing', 'api testing', 'integration testing',
-                'junior qa', 'senior qa', 'lead qa', 'qa lead'
-            ],
-            'blockchain developer': [
-                'blockchain', 'blockchain developer', 'blockchain engineer',
-                'solidity', 'ethereum', 'web3', 'smart contract',
-                'crypto', 'cryptocurrency', 'defi', 'nft',
-                'hyperledger', 'truffle', 'hardhat',
-                'junior blockchain', 'senior blockchain'
-            ],
-            'game developer': [
-                'game', 'game developer', 'game engineer', 'game designer',
-                'unity', 'unreal', 'unreal engine', 'game engine',
-                'c++', 'c#', '3d', 'graphics', 'gameplay',
-                'junior game developer', 'senior game developer'
-            ],
-            'cyber security specialist': [
-                'security', 'cybersecurity', 'cyber security', 'infosec', 'information security',
-                'security engineer', 'security analyst', 'security specialist',
-                'penetration testing', 'pentesting', 'ethical hacking', 'security testing',
-                'threat', 'vulnerability', 'compliance', 'risk',
-                'soc', 'security operations', 'incident response',
-                'cissp', 'ceh', 'security+',
-                'junior security', 'senior security', 'lead security'
-            ],
-            'product manager': [
-                'product manager', 'product owner', 'pm', 'po',
-                'product', 'product lead', 'senior product manager',
-                'technical product manager', 'tpm',
-                'product strategy', 'product development'
-            ],
-            'data analyst': [
-                'data analyst', 'business analyst', 'analytics',
-                'sql analyst', 'reporting analyst', 'bi analyst',
-                'excel', 'tableau', 'power bi', 'looker', 'sql',
-                'junior data analyst', 'senior data analyst'
-            ]
-        }
-        
         relevance_scores = {}
         relevant_roles = {}
         
-        for pathway, keywords in pathway_keywords.items():
+        for pathway, keywords in _PATHWAY_KEYWORDS.items():
             matching_experiences = []
             total_relevance = 0
             
-            for idx, exp in enumerate(work_experiences):
-                job_title = (exp.get('job_title', '') or '').lower()
-                company = (exp.get('company_name', '') or '').lower()
-                description = (exp.get('description', '') or '').lower()
+            # Tech companies get a bonus for tech roles
+            tech_context_boost = 1.2 if pathway in _TECH_CONTEXT_PATHWAYS else 1.0
+            
+            for exp, experience_keywords, duration_weight, recency_weight, is_tech in prepped:
+                title_keywords, description_keywords, company_keywords = experience_keywords
                 
                 # Check for keyword matches
                 match_score = 0
                 for keyword in keywords:
-                    if keyword in job_title:
+                    if keyword in title_keywords:
                         match_score += 1.0
-                    elif keyword in description:
+                    elif keyword in description_keywords:
                         match_score += 0.3
-                    elif keyword in company:
+                    elif keyword in company_keywords:
                         match_score += 0.2
                 
                 if match_score > 0:
-                    # Weight by duration
-                    duration_weight = min((exp.get('duration_months', 0) or 0) / 12, 1.0)  # Up to 1 year max weight
-                    
-                    # Apply recency weight
-                    recency_weight = self._calculate_recency_weight(
-                        exp.get('end_date', ''),
-                        exp.get('is_current', False)
-                    )
-                    
-                    # Apply company context boost (tech companies get bonus for tech roles)
-                    company_context = company_contexts[idx] if idx < len(company_contexts) else {}
-                    context_boost = 1.0
-                    if company_context.get('is_tech') and pathway in ['frontend developer', 'backend developer', 
-                                                                       'full stack developer', 'devops engineer',
-                                                                       'mobile developer', 'data scientist']:
-                        context_boost = 1.2
-                    
+                    context_boost = tech_context_boost if is_tech else 1.0
                     total_relevance += match_score * duration_weight * recency_weight * context_boost
                     matching_experiences.append(exp)
             
@@ -527,43 +826,6 @@ class CareerRecommender:
             'tech_experience_ratio': tech_experience_ratio
         }
     
-    def _detect_seniority_level(self, job_title: str) -> int:
-        """
-        Detect seniority level from job title.
-        Returns a score from 0 (entry) to 5 (executive)
-        """
-        if not job_title:
-            return 1  # Default to entry level
-        
-        title_lower = job_title.lower()
-        
-        # Executive/Director level (5)
-        if any(keyword in title_lower for keyword in ['cto', 'cio', 'vp', 'vice president', 'director', 'head of', 'chief']):
-            return 5
-        
-        # Principal/Staff level (4)
-        if any(keyword in title_lower for keyword in ['principal', 'staff', 'distinguished', 'fellow']):
-            return 4
-        
-        # Lead/Senior level (3)
-        if any(keyword in title_lower for keyword in ['lead', 'senior', 'sr.', 'sr ']):
-            return 3
-        
-        # Mid level (2)
-        if any(keyword in title_lower for keyword in ['engineer', 'developer', 'analyst', 'designer', 'architect']) and \
-           not any(keyword in title_lower for keyword in ['junior', 'jr', 'associate', 'intern', 'entry']):
-            return 2
-        
-        # Junior/Entry level (1)
-        if any(keyword in title_lower for keyword in ['junior', 'jr.', 'jr ', 'associate', 'entry']):
-            return 1
-        
-        # Intern level (0)
-        if any(keyword in title_lower for keyword in ['intern', 'trainee', 'apprentice']):
-            return 0
-        
-        return 1  # Default to entry level
-    
     def _analyze_career_trajectory(self, work_experiences: List[Dict]) -> Dict:
         """
         Analyze career progression from work experiences.
@@ -587,7 +849,7 @@ class CareerRecommender:
         # Detect seniority levels
         levels = []
         for exp in sorted_exp:
-            level = self._detect_seniority_level(exp.get('job_title', ''))
+            level = _detect_seniority_level(exp.get('job_title', ''))
             levels.append({
                 'title': exp.get('job_title', ''),
                 'level': level,
@@ -642,39 +904,6 @@ class CareerRecommender:
             'description': descriptions.get(trajectory_type, '')
         }
     
-    def _calculate_recency_weight(self, end_date: str, is_current: bool) -> float:
-        """
-        Calculate recency weight using exponential decay.
-        Recent experience (last 2-3 years) weighted more heavily.
-        Returns weight between 0.3 (old) and 1.0 (current/recent)
-        """
-        if is_current:
-            return 1.0
-        
-        if not end_date or end_date.lower() == 'present':
-            return 1.0
-        
-        try:
-            # Try to extract year from end_date
-            year_match = re.search(r'(\d{4})', end_date)
-            if year_match:
-                end_year = int(year_match.group(1))
-                current_year = datetime.now().year
-                years_ago = current_year - end_year
-                
-                # Exponential decay: weight = e^(-0.3 * years_ago)
-                # Current: 1.0, 1 year: 0.74, 2 years: 0.55, 3 years: 0.41, 5 years: 0.22
-                import math
-                weight = math.exp(-0.3 * years_ago)
-                
-                # Clamp between 0.3 and 1.0
-                return max(0.3, min(1.0, weight))
-        except Exception:
-            pass
-        
-        # Default to moderate weight if we can't parse
-        return 0.6
-    
     def _extract_company_context(self, company_name: str, description: str) -> Dict:
         """
         Extract company context (size, industry) from company name and description.
@@ -731,3 +960,9 @@ class CareerRecommender:
             context['industry'] = 'other'
         
         return context
+
+
+@lru_cache(maxsize=1)
+def get_recommender() -> CareerRecommender:
+    """Shared CareerRecommender, so the pathway data is loaded once per process"""
+    return CareerRecommender()
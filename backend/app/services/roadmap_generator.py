@@ -4,9 +4,12 @@ Generates personalized learning roadmaps based on skill gaps and career pathways
 """
 
 import json
+import threading
 from typing import List, Dict, Any, Set
 from pathlib import Path
-from datetime import datetime, timedelta
+from functools import lru_cache
+from datetime import date, datetime, timedelta
+from cachetools import LRUCache
 
 
 class RoadmapGenerator:
@@ -23,12 +26,27 @@ class RoadmapGenerator:
         with open(certs_file, 'r') as f:
             self.certifications = json.load(f)
         
+        # Certification lists by lower-cased pathway name, for lookups that
+        # ignore case without lowering every key on each call
+        self._certifications_by_lower = {
+            name.lower(): certs for name, certs in self.certifications.items()
+        }
+        
+        # Every pathway with career data or certifications, sorted by name
+        pathway_names = {path.get("name") for path in self.pathways_data.get("pathways", [])}
+        pathway_names.update(self.certifications.keys())
+        self.all_pathway_names = tuple(sorted(pathway_names))
+        
         # Skill difficulty levels
         self.skill_difficulty = {
             "beginner": ["HTML", "CSS", "Git", "SQL", "JavaScript basics"],
             "intermediate": ["React", "Node.js", "Python", "Docker", "REST API"],
             "advanced": ["Kubernetes", "AWS", "System Design", "Machine Learning", "Microservices"]
         }
+        
+        # Generated roadmaps (as JSON) keyed by their normalized inputs
+        self._roadmap_cache = LRUCache(maxsize=4096)
+        self._roadmap_cache_lock = threading.Lock()
     
     def generate_roadmap(
         self,
@@ -47,6 +65,35 @@ class RoadmapGenerator:
         Returns:
             Dictionary containing the structured roadmap
         """
+        # Skill order and case don't change the roadmap; the date does
+        # (timeline and milestone dates start today)
+        key = (
+            pathway,
+            frozenset(skill.lower() for skill in current_skills),
+            len(current_skills),
+            work_experience_years,
+            date.today()
+        )
+        with self._roadmap_cache_lock:
+            roadmap_json = self._roadmap_cache.get(key)
+        
+        if roadmap_json is None:
+            roadmap_json = json.dumps(
+                self._build_roadmap(pathway, current_skills, work_experience_years)
+            )
+            with self._roadmap_cache_lock:
+                self._roadmap_cache[key] = roadmap_json
+        
+        # Callers get a fresh copy, so changes to it never reach the cache
+        return json.loads(roadmap_json)
+    
+    def _build_roadmap(
+        self,
+        pathway: str,
+        current_skills: List[str],
+        work_experience_years: float
+    ) -> Dict[str, Any]:
+        """Build a roadmap from scratch (see generate_roadmap)"""
         # Normalize inputs
         current_skills_set = set(skill.lower() for skill in current_skills)
         
@@ -227,21 +274,38 @@ class RoadmapGenerator:
             "hours_per_week_recommended": 10 if experience_years < 2 else 5
         }
     
+    def find_certifications(self, pathway: str) -> List[Dict[str, Any]]:
+        """Get the certifications for a pathway name, falling back to a similar pathway"""
+        pathway_lower = pathway.lower()
+        certs = self._certifications_by_lower.get(pathway_lower)
+        if certs is not None:
+            return certs
+        
+        # Try to find similar pathway
+        for name_lower, certs in self._certifications_by_lower.items():
+            if pathway_lower in name_lower or name_lower in pathway_lower:
+                return certs
+        
+        return []
+    
     def _get_relevant_certifications(self, pathway: str, phases: List[Dict]) -> List[Dict[str, Any]]:
         """Get relevant certifications for the pathway"""
         certs = self.certifications.get(pathway, [])
         
-        # Add difficulty level based on phases
-        for cert in certs:
-            phase_count = len(phases)
+        # Add difficulty level based on phases (on copies, since the
+        # certification data is shared across requests)
+        relevant = []
+        phase_count = len(phases)
+        for cert in certs[:5]:  # Return top 5 most relevant
             if phase_count <= 2 and cert.get("difficulty") == "Beginner":
-                cert["recommended_timing"] = "Start learning"
+                timing = "Start learning"
             elif cert.get("difficulty") == "Intermediate":
-                cert["recommended_timing"] = "After fundamentals"
+                timing = "After fundamentals"
             else:
-                cert["recommended_timing"] = "After core skills"
+                timing = "After core skills"
+            relevant.append({**cert, "recommended_timing": timing})
         
-        return certs[:5]  # Return top 5 most relevant
+        return relevant
     
     def _get_learning_resources(self, phases: List[Dict]) -> Dict[str, List[Dict[str, str]]]:
         """Get learning resources organized by type"""
@@ -365,3 +429,8 @@ class RoadmapGenerator:
             "estimated_time_to_proficiency": 24
         }
 
+
+@lru_cache(maxsize=1)
+def get_roadmap_generator() -> RoadmapGenerator:
+    """Shared RoadmapGenerator, so pathway and certification data are loaded once per process"""
+    return RoadmapGenerator()
@@ -0,0 +1,43 @@
+"""
+Migration script to add the ai_insight column to the recommendations table.
+AI insights are now fetched in the background and stored with the top
+recommendation instead of only being returned in the generate response.
+"""
+
+import sys
+import os
+
+# Add the parent directory to the path so we can import from app
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import inspect, text
+from app.core.database import engine
+
+
+def migrate():
+    """Run the migration"""
+    print("=" * 60)
+    print("Recommendation AI Insight Migration")
+    print("=" * 60)
+
+    inspector = inspect(engine)
+    if "recommendations" not in inspector.get_table_names():
+        print("\nTable recommendations does not exist yet. It will be created with the new schema on startup.")
+        return
+
+    existing_columns = {column["name"] for column in inspector.get_columns("recommendations")}
+    if "ai_insight" in existing_columns:
+        print("\n✅ Column recommendations.ai_insight already exists. No migration needed.")
+        return
+
+    column_type = "JSONB" if engine.dialect.name == "postgresql" else "JSON"
+    with engine.begin() as conn:
+        conn.execute(text(f"ALTER TABLE recommendations ADD COLUMN ai_insight {column_type}"))
+    print("✓ Added column: ai_insight")
+
+    print("\n✅ Migration completed successfully!")
+    print("\n" + "=" * 60)
+
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,43 @@
+"""
+Migration script to add the processing status column to the cvs table.
+Uploads are now parsed in the background; existing CVs are marked completed.
+"""
+
+import sys
+import os
+
+# Add the parent directory to the path so we can import from app
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import inspect, text
+from app.core.database import engine
+
+
+def migrate():
+    """Run the migration"""
+    print("=" * 60)
+    print("CV Status Migration")
+    print("=" * 60)
+
+    inspector = inspect(engine)
+    if "cvs" not in inspector.get_table_names():
+        print("\nTable cvs does not exist yet. It will be created with the new schema on startup.")
+        return
+
+    existing_columns = {column["name"] for column in inspector.get_columns("cvs")}
+    if "status" in existing_columns:
+        print("\n✅ Column cvs.status already exists. No migration needed.")
+        return
+
+    with engine.begin() as conn:
+        conn.execute(text(
+            "ALTER TABLE cvs ADD COLUMN status VARCHAR NOT NULL DEFAULT 'completed'"
+        ))
+    print("✓ Added column: status")
+
+    print("\n✅ Migration completed successfully!")
+    print("\n" + "=" * 60)
+
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,70 @@
+"""
+Migration script to add model indexes to an existing database.
+create_all() only builds indexes for new tables, so run this after
+pulling model changes that add indexes to tables you already have.
+Indexes that have been replaced by a newer definition are dropped.
+"""
+
+import sys
+import os
+
+# Add the parent directory to the path so we can import from app
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import Index, inspect
+from app.core.database import Base, engine
+from app.models import models  # noqa
+
+# Indexes superseded by a model index under a new name
+RETIRED_INDEXES = {
+    "recommendations": ["ix_recommendations_cv_id_match_score"],
+}
+
+
+def migrate():
+    """Run the migration"""
+    print("=" * 60)
+    print("Database Index Migration")
+    print("=" * 60)
+
+    inspector = inspect(engine)
+    existing_tables = inspector.get_table_names()
+
+    created = []
+    dropped = []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            # New tables get their indexes from create_all on startup
+            continue
+
+        existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index_name in RETIRED_INDEXES.get(table.name, []):
+            if index_name not in existing_indexes:
+                continue
+            try:
+                Index(index_name, _table=table).drop(bind=engine)
+                dropped.append(index_name)
+                print(f"✓ Dropped index: {index_name}")
+            except Exception as e:
+                print(f"✗ Failed to drop index {index_name}: {e}")
+
+        for index in table.indexes:
+            if index.name in existing_indexes:
+                continue
+            try:
+                index.create(bind=engine)
+                created.append(index.name)
+                print(f"✓ Created index: {index.name}")
+            except Exception as e:
+                print(f"✗ Failed to create index {index.name}: {e}")
+
+    if not created and not dropped:
+        print("\n✅ All indexes already exist. No migration needed.")
+    else:
+        print(f"\n✅ Migration completed successfully! Created {len(created)} index(es), dropped {len(dropped)}.")
+
+    print("\n" + "=" * 60)
+
+
+if __name__ == "__main__":
+    migrate()
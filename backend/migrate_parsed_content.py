@@ -0,0 +1,78 @@
+"""
+Migration script to convert cvs.parsed_content to JSON.
+Older rows stored str(dict) (a Python repr) in a TEXT column; this rewrites
+them as JSON and, on PostgreSQL, changes the column type to JSONB.
+"""
+
+import ast
+import json
+import sys
+import os
+
+# Add the parent directory to the path so we can import from app
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import inspect, text
+from app.core.database import engine
+
+
+def _to_json(value):
+    """Convert a stored parsed_content value to a JSON string (None if unreadable)"""
+    try:
+        json.loads(value)
+        return value
+    except (TypeError, ValueError):
+        pass
+
+    try:
+        sections = ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        return None
+
+    return json.dumps(sections) if isinstance(sections, dict) else None
+
+
+def migrate():
+    """Run the migration"""
+    print("=" * 60)
+    print("Parsed Content JSON Migration")
+    print("=" * 60)
+
+    if "cvs" not in inspect(engine).get_table_names():
+        print("\nTable cvs does not exist yet. It will be created with the new schema on startup.")
+        return
+
+    converted = 0
+    cleared = 0
+    with engine.begin() as conn:
+        rows = conn.execute(
+            text("SELECT id, CAST(parsed_content AS TEXT) FROM cvs WHERE parsed_content IS NOT NULL")
+        ).all()
+
+        for cv_id, value in rows:
+            new_value = _to_json(value)
+            if new_value == value:
+                continue
+
+            conn.execute(
+                text("UPDATE cvs SET parsed_content = :value WHERE id = :id"),
+                {"value": new_value, "id": cv_id}
+            )
+            if new_value is None:
+                cleared += 1
+                print(f"✗ CV {cv_id}: could not read parsed_content, cleared it")
+            else:
+                converted += 1
+
+        if engine.dialect.name == "postgresql":
+            conn.execute(text(
+                "ALTER TABLE cvs ALTER COLUMN parsed_content TYPE JSONB USING parsed_content::jsonb"
+            ))
+            print("✓ Changed cvs.parsed_content to JSONB")
+
+    print(f"\n✅ Migration completed successfully! Converted {converted} row(s), cleared {cleared}.")
+    print("\n" + "=" * 60)
+
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,71 @@
+"""
+Migration script to convert progress_entries.skills_learned and metrics to JSON.
+Older rows stored both as JSON-encoded TEXT; values that are not valid JSON
+are cleared and, on PostgreSQL, the columns are changed to JSONB.
+"""
+
+import json
+import sys
+import os
+
+# Add the parent directory to the path so we can import from app
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import inspect, text
+from app.core.database import engine
+
+COLUMNS = ["skills_learned", "metrics"]
+
+
+def _is_json(value):
+    """Check whether a stored value is valid JSON"""
+    try:
+        json.loads(value)
+    except ValueError:
+        return False
+    return True
+
+
+def migrate():
+    """Run the migration"""
+    print("=" * 60)
+    print("Progress Entries JSON Migration")
+    print("=" * 60)
+
+    if "progress_entries" not in inspect(engine).get_table_names():
+        print("\nTable progress_entries does not exist yet. It will be created with the new schema on startup.")
+        return
+
+    cleared = 0
+    with engine.begin() as conn:
+        for column in COLUMNS:
+            rows = conn.execute(
+                text(
+                    f"SELECT id, CAST({column} AS TEXT) FROM progress_entries "
+                    f"WHERE {column} IS NOT NULL"
+                )
+            ).all()
+
+            for entry_id, value in rows:
+                if _is_json(value):
+                    continue
+
+                conn.execute(
+                    text(f"UPDATE progress_entries SET {column} = NULL WHERE id = :id"),
+                    {"id": entry_id}
+                )
+                cleared += 1
+
+            if engine.dialect.name == "postgresql":
+                conn.execute(text(
+                    f"ALTER TABLE progress_entries ALTER COLUMN {column} "
+                    f"TYPE JSONB USING {column}::jsonb"
+                ))
+                print(f"✓ Changed progress_entries.{column} to JSONB")
+
+    print(f"\n✅ Migration completed successfully! Cleared {cleared} invalid value(s).")
+    print("\n" + "=" * 60)
+
+
+if __name__ == "__main__":
+    migrate()
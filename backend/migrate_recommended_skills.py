@@ -0,0 +1,72 @@
+"""
+Migration script to convert recommendations.recommended_skills to JSON.
+Older rows stored the skills as a comma-separated string in a TEXT column;
+this rewrites them as JSON lists and, on PostgreSQL, changes the column
+type to JSONB.
+"""
+
+import json
+import sys
+import os
+
+# Add the parent directory to the path so we can import from app
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import inspect, text
+from app.core.database import engine
+
+
+def _to_json(value):
+    """Convert a stored recommended_skills value to a JSON list string"""
+    try:
+        if isinstance(json.loads(value), list):
+            return value
+    except ValueError:
+        pass
+
+    return json.dumps([skill for skill in value.split(",") if skill])
+
+
+def migrate():
+    """Run the migration"""
+    print("=" * 60)
+    print("Recommended Skills JSON Migration")
+    print("=" * 60)
+
+    if "recommendations" not in inspect(engine).get_table_names():
+        print("\nTable recommendations does not exist yet. It will be created with the new schema on startup.")
+        return
+
+    converted = 0
+    with engine.begin() as conn:
+        rows = conn.execute(
+            text(
+                "SELECT id, CAST(recommended_skills AS TEXT) FROM recommendations "
+                "WHERE recommended_skills IS NOT NULL"
+            )
+        ).all()
+
+        for recommendation_id, value in rows:
+            new_value = _to_json(value)
+            if new_value == value:
+                continue
+
+            conn.execute(
+                text("UPDATE recommendations SET recommended_skills = :value WHERE id = :id"),
+                {"value": new_value, "id": recommendation_id}
+            )
+            converted += 1
+
+        if engine.dialect.name == "postgresql":
+            conn.execute(text(
+                "ALTER TABLE recommendations ALTER COLUMN recommended_skills "
+                "TYPE JSONB USING recommended_skills::jsonb"
+            ))
+            print("✓ Changed recommendations.recommended_skills to JSONB")
+
+    print(f"\n✅ Migration completed successfully! Converted {converted} row(s).")
+    print("\n" + "=" * 60)
+
+
+if __name__ == "__main__":
+    migrate()
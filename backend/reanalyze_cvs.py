@@ -0,0 +1,133 @@
+"""
+Re-analyse all CVs with AI insights from the OpenAI Batch API.
+Meant for scheduled (e.g. nightly) runs, where results can wait: batch jobs
+cost half as much as interactive calls and finish within 24 hours.
+
+Usage:
+    python reanalyze_cvs.py submit             Regenerate recommendations and queue AI insights
+    python reanalyze_cvs.py apply <batch_id>   Store the insights of a completed batch
+"""
+
+import asyncio
+import sys
+import os
+
+# Add the parent directory to the path so we can import from app
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+from app.core.database import async_session, init_db
+from app.models.models import CV, CV_STATUS_COMPLETED
+from app.services.ai_enhancer import get_ai_enhancer
+from app.services.recommendation_store import (
+    invalidate_cached_reports,
+    save_recommendations,
+    skills_to_dicts,
+    store_ai_insight,
+    work_experiences_to_dicts,
+)
+from app.services.recommender import get_recommender
+
+TOP_N = 10
+
+
+async def submit():
+    """Regenerate every parsed CV's recommendations and submit their AI enhancement batch"""
+    enhancer = get_ai_enhancer()
+    if not enhancer.async_client:
+        print("❌ AI enhancement is not configured (USE_AI_ENHANCEMENT and OPENAI_API_KEY)")
+        return
+
+    recommender = get_recommender()
+    async with async_session() as db:
+        cvs = (
+            await db.execute(
+                select(CV)
+                .options(selectinload(CV.skills), selectinload(CV.work_experiences))
+                .where(CV.status == CV_STATUS_COMPLETED)
+            )
+        ).scalars().all()
+
+        jobs = {}
+        for cv in cvs:
+            if not cv.skills:
+                continue
+
+            skill_dicts = skills_to_dicts(cv.skills)
+            recommendations = recommender.recommend_pathways(
+                skill_dicts,
+                work_experiences=work_experiences_to_dicts(cv.work_experiences),
+                top_n=TOP_N,
+                min_score=0.05
+            )
+            await save_recommendations(db, cv.id, recommendations)
+            if recommendations:
+                jobs[f"cv-{cv.id}"] = (cv.raw_text or "", skill_dicts, recommendations)
+
+        if not jobs:
+            print("No CVs with recommendations to enhance found.")
+            return
+
+        batch_id = await enhancer.submit_enhancement_batch(
+            jobs,
+            metadata={"source": "reanalyze_cvs"}
+        )
+        if not batch_id:
+            print("❌ Failed to submit AI enhancement batch")
+            return
+
+        await db.commit()
+
+        cv_ids = [int(custom_id[len("cv-"):]) for custom_id in jobs]
+        await invalidate_cached_reports(db, cv_ids)
+
+    print(f"✓ Regenerated recommendations for {len(cv_ids)} CV(s)")
+    print(f"✓ Submitted batch: {batch_id}")
+    print(f"\nOnce it has completed, run:\n  python reanalyze_cvs.py apply {batch_id}")
+
+
+async def apply(batch_id: str):
+    """Store the AI insights of a completed batch on each CV's top recommendation"""
+    enhancer = get_ai_enhancer()
+    batch = await enhancer.get_enhancement_batch(batch_id)
+    if batch is None:
+        print(f"❌ Batch {batch_id} not found")
+        return
+
+    if batch.status != "completed":
+        print(f"Batch {batch_id} is {batch.status}. Try again later.")
+        return
+
+    insights = {
+        int(custom_id[len("cv-"):]): ai_data
+        for custom_id, ai_data in (await enhancer.read_enhancement_batch(batch)).items()
+    }
+
+    async with async_session() as db:
+        existing_cv_ids = (
+            await db.execute(select(CV.id).where(CV.id.in_(insights)))
+        ).scalars().all()
+        for cv_id in existing_cv_ids:
+            await store_ai_insight(db, cv_id, insights[cv_id])
+        await db.commit()
+        await invalidate_cached_reports(db, existing_cv_ids)
+
+    print(f"✅ Stored AI insights for {len(existing_cv_ids)} CV(s)")
+
+
+async def main(args):
+    try:
+        if args[:1] == ["submit"]:
+            await submit()
+        elif args[:1] == ["apply"] and len(args) == 2:
+            await apply(args[1])
+        else:
+            print(__doc__)
+    finally:
+        await get_ai_enhancer().close()
+
+
+if __name__ == "__main__":
+    init_db()
+    asyncio.run(main(sys.argv[1:]))
@@ -0,0 +1,41 @@
+"""
+Capture a progress snapshot of every parsed CV.
+Meant for scheduled (e.g. weekly) runs, so progress timelines keep filling
+in between the snapshots users capture themselves.
+
+Usage:
+    python snapshot_progress.py
+"""
+
+import sys
+import os
+
+# Add the parent directory to the path so we can import from app
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import select
+from app.core.database import SessionLocal, init_db
+from app.models.models import CV, CV_STATUS_COMPLETED
+from app.services.progress_tracker import ProgressTracker
+
+# CVs per transaction, which also bounds the size of each IN list
+BATCH_SIZE = 500
+
+
+def main():
+    """Capture snapshots for all parsed CVs, one transaction per batch"""
+    with SessionLocal() as db:
+        cv_ids = db.execute(
+            select(CV.id).where(CV.status == CV_STATUS_COMPLETED).order_by(CV.id)
+        ).scalars().all()
+
+        tracker = ProgressTracker(db)
+        for start in range(0, len(cv_ids), BATCH_SIZE):
+            tracker.capture_snapshot_batch(cv_ids[start:start + BATCH_SIZE])
+
+    print(f"✅ Captured progress snapshots for {len(cv_ids)} CV(s)")
+
+
+if __name__ == "__main__":
+    init_db()
+    main()
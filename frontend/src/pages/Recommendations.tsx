@@ -6,6 +6,10 @@ import { PieChart, Pie, Cell, BarChart, Bar, XAxis, YAxis, CartesianGrid, Toolti
 import type { RecommendationResult, CVDetail, WorkExperience } from '../types';
 import axios from 'axios';
 
+// AI insights are fetched after the recommendations are returned; poll for them
+const AI_POLL_INTERVAL_MS = 2000;
+const AI_POLL_ATTEMPTS = 30;
+
 // Info Tooltip Component
 const InfoTooltip: React.FC<{ title: string; description: string }> = ({ title, description }) => {
   const [showTooltip, setShowTooltip] = useState(false);
@@ -151,8 +155,9 @@ const Recommendations: React.FC = () => {
             description: '',
             match_score: rec.match_score,
             reasoning: rec.reasoning || '',
-            recommended_skills: rec.recommended_skills ? rec.recommended_skills.split(',') : [],
+            recommended_skills: rec.recommended_skills || [],
             roadmap_url: '',
+            ai_insight: rec.ai_insight || undefined,
             is_ai_enhanced: rec.is_ai_enhanced || false,
           })),
           total_skills: cvDetailData.skills.length,
@@ -165,6 +170,30 @@ const Recommendations: React.FC = () => {
     }
   };
 
+  const waitForAIInsights = async (id: number) => {
+    for (let attempt = 0; attempt < AI_POLL_ATTEMPTS; attempt++) {
+      await new Promise((resolve) => setTimeout(resolve, AI_POLL_INTERVAL_MS));
+      try {
+        const savedRecs = await recommendationsAPI.getForCV(id);
+        const enhanced = savedRecs.find((rec: any) => rec.is_ai_enhanced);
+        if (enhanced) {
+          setRecommendations((current) => current && current.cv_id === id ? {
+            ...current,
+            recommendations: current.recommendations.map((rec) =>
+              rec.pathway === enhanced.pathway
+                ? { ...rec, ai_insight: enhanced.ai_insight, is_ai_enhanced: true }
+                : rec
+            ),
+          } : current);
+          return;
+        }
+      } catch (err: any) {
+        console.error('Failed to load AI insights:', err);
+        return;
+      }
+    }
+  };
+
   const handleGenerateRecommendations = async () => {
     if (!cvId) return;
 
@@ -174,6 +203,9 @@ const Recommendations: React.FC = () => {
     try {
       const result = await recommendationsAPI.generate(parseInt(cvId), useAI, 5);
       setRecommendations(result);
+      if (result.ai_enhancement_pending) {
+        waitForAIInsights(result.cv_id);
+      }
     } catch (err: any) {
       setError(err.response?.data?.detail || 'Failed to generate recommendations');
     } finally {
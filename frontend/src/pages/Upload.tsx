@@ -3,6 +3,9 @@ import { useNavigate } from 'react-router-dom';
 import { cvAPI } from '../services/api';
 import { Upload as UploadIcon, FileText, AlertCircle, CheckCircle, ArrowLeft } from 'lucide-react';
 
+const POLL_INTERVAL_MS = 1000;
+const POLL_ATTEMPTS = 120;
+
 const Upload: React.FC = () => {
   const navigate = useNavigate();
   const [file, setFile] = useState<File | null>(null);
@@ -64,13 +67,24 @@ const Upload: React.FC = () => {
     setUploadProgress('Uploading file...');
 
     try {
-      // Simulate progress updates
-      setTimeout(() => setUploadProgress('Processing CV...'), 500);
-      setTimeout(() => setUploadProgress('Extracting skills...'), 1500);
-      setTimeout(() => setUploadProgress('Analyzing work experience...'), 2500);
-      
       const result = await cvAPI.upload(file);
       
+      // Parsing runs on the server after the upload; poll until it finishes
+      setUploadProgress('Processing CV...');
+      let detail = await cvAPI.getDetail(result.cv_id);
+      for (let attempt = 0; attempt < POLL_ATTEMPTS && detail.cv.status === 'pending'; attempt++) {
+        await new Promise((resolve) => setTimeout(resolve, POLL_INTERVAL_MS));
+        detail = await cvAPI.getDetail(result.cv_id);
+      }
+      
+      if (detail.cv.status === 'pending') {
+        throw new Error('Processing your CV is taking longer than expected. Please try uploading it again.');
+      }
+      
+      if (detail.cv.status === 'failed') {
+        throw new Error('We could not read this CV. Please check the file and try again.');
+      }
+      
       setUploadProgress('Complete!');
       setCvId(result.cv_id);
       setSuccess(true);
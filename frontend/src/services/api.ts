@@ -6,7 +6,7 @@ import type {
   User,
   CV,
   CVDetail,
-  CVAnalysis,
+  CVUpload,
   RecommendationResult,
   CareerPathway
 } from '../types';
@@ -75,11 +75,11 @@ export const authAPI = {
 
 // CV API
 export const cvAPI = {
-  upload: async (file: File): Promise<CVAnalysis> => {
+  upload: async (file: File): Promise<CVUpload> => {
     const formData = new FormData();
     formData.append('file', file);
     
-    const response = await api.post<CVAnalysis>('/cv/upload', formData, {
+    const response = await api.post<CVUpload>('/cv/upload', formData, {
       headers: {
         'Content-Type': 'multipart/form-data',
       },
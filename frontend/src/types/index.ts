@@ -26,8 +26,11 @@ export interface CV {
   upload_date: string;
   years_experience?: number;
   education_level?: string;
+  status: CVStatus;
 }
 
+export type CVStatus = 'pending' | 'completed' | 'failed';
+
 export interface Skill {
   id: number;
   skill_name: string;
@@ -55,19 +58,13 @@ export interface CVDetail {
   cv: CV;
   skills: Skill[];
   work_experiences: WorkExperience[];
-  parsed_content?: string;
+  parsed_content?: Record<string, string>;
 }
 
-export interface CVAnalysis {
+export interface CVUpload {
   cv_id: number;
   filename: string;
-  skills_found: number;
-  skills: Skill[];
-  work_experiences: WorkExperience[];
-  work_experience_count: number;
-  years_experience?: number;
-  education_level?: string;
-  sections: Record<string, string>;
+  status: CVStatus;
 }
 
 export interface PathwayRecommendation {
@@ -89,6 +86,7 @@ export interface RecommendationResult {
   cv_id: number;
   recommendations: PathwayRecommendation[];
   total_skills: number;
+  ai_enhancement_pending?: boolean;
 }
 
 export interface CareerPathway {